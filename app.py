@@ -1,99 +1,96 @@
 import random
-import praw
 import os
 import time
 from openai import OpenAI
 from datetime import datetime
-from colorama import init, Fore, Style
+from colorama import init
 from prawcore.exceptions import PrawcoreException
 import traceback
-import sys
+from history_store import CommentHistoryStore
+from seen_posts import SeenPosts
+from bot_config import SUBREDDITS_FILE, bot_config
+from bot_logging import LOG_DIR, SUCCESS, setup_logging
+from metrics import metrics
+from reddit_session import RedditSession, is_auth_error
+from listing_cache import ListingFetcher
+import heartbeat
+import shutdown
+from shutdown import ShutdownRequested
+import profiling
 
 # Initialize colorama for colored console output
 init()
 
-# Modify the logging setup section
 # Configure logging for both console and file
-log_dir = os.path.join(os.path.expanduser('~'), 'redditbot', 'logs')
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, 'bot.log')
-
-# Create a tee-like function to write to both console and file
-class Tee:
-    def __init__(self, *files):
-        self.files = files
-
-    def write(self, obj):
-        for file in self.files:
-            file.write(obj)
-            file.flush()
-
-    def flush(self):
-        for file in self.files:
-            file.flush()
-
-# Keep original stdout and stderr
-original_stdout = sys.stdout
-original_stderr = sys.stderr
-
-# Open log file and set up Tee
-log_file_handle = open(log_file, 'a', encoding='utf-8')
-sys.stdout = Tee(original_stdout, log_file_handle)
-sys.stderr = Tee(original_stderr, log_file_handle)
+logger = setup_logging(LOG_DIR)
 
 # Bot information and configuration
 BOT_VERSION = "1.0.0"
 BOT_AUTHOR = "syedbilalalam"
-BOT_CONFIG = {
-    'max_comments_per_subreddit': 1,
-    'min_sleep_seconds': 3600,    # 1 hour minimum between comments
-    'max_sleep_seconds': 7200,    # 2 hours maximum between comments
-    'cycle_sleep_minutes': 180,   # 3 hours between cycles
-    'rate_limit_sleep': 3600,     # 1 hour when rate limited
-    'max_retries': 3,
-    'min_post_score': 10,         # Reduced minimum score requirement
-    'blacklisted_phrases': [
-        '[removed]', '[deleted]', 'mod post', 'moderator', 'announcement',
-        'sticky', 'megathread'
-    ],
-    'max_title_length': 300,
-    'posts_per_request': 10,      # Reduced from 25 for new accounts
-    'max_daily_comments': 10,     # New: limit daily comments
-    'account_age_days': 0,        # Changed to 0 to allow new accounts
-    'min_karma': 0               # Changed to 0 to allow new accounts
-}
-
-def log_info(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Fore.CYAN}[INFO] {timestamp} - {message}{Style.RESET_ALL}")
-
-def log_success(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Fore.GREEN}[SUCCESS] {timestamp} - {message}{Style.RESET_ALL}")
-
-def log_warning(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Fore.YELLOW}[WARNING] {timestamp} - {message}{Style.RESET_ALL}")
-
-def log_error(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Fore.RED}[ERROR] {timestamp} - {message}{Style.RESET_ALL}")
+# Live view of bot_config.json over the defaults; picks up edits without a restart
+BOT_CONFIG = bot_config
+
+def log_info(message, **fields):
+    logger.info(message, extra={'fields': fields})
+
+def log_success(message, **fields):
+    logger.log(SUCCESS, message, extra={'fields': fields})
+
+def log_warning(message, **fields):
+    logger.warning(message, extra={'fields': fields})
+
+def log_error(message, **fields):
+    logger.error(message, extra={'fields': fields})
+
+def sleep(seconds, reason):
+    """Wait while recording the idle time in the bot metrics
+
+    Waits in short steps so the supervisor keeps seeing heartbeats, and
+    raises ShutdownRequested as soon as a shutdown signal arrives. The wake
+    time is saved so a restarted bot can finish the wait instead of
+    starting its schedule over.
+    """
+    with metrics.sleeping(reason):
+        deadline = time.monotonic() + seconds
+        shutdown.save_schedule(reason, time.time() + seconds)
+        while True:
+            heartbeat.beat()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if shutdown.wait(min(remaining, heartbeat.HEARTBEAT_INTERVAL)):
+                raise ShutdownRequested()
+        shutdown.clear_schedule()
+
+def resume_schedule():
+    """Finish a wait that a previous run was interrupted in"""
+    schedule = shutdown.load_schedule()
+    if schedule is None:
+        return
+    log_info(f"Resuming '{schedule['reason']}' wait with {int(schedule['remaining_seconds'])} seconds left")
+    sleep(schedule['remaining_seconds'], schedule['reason'])
+
+def close_state():
+    """Flush metrics and profiles and close the history store before exiting"""
+    profiling.stop_profiling()
+    metrics.flush(force=True)
+    history_store.close()
 
 def print_banner():
     banner = f"""
-{Fore.CYAN}╔══════════════════════════════════════════════╗
+╔══════════════════════════════════════════════╗
 ║         Reddit Bot          ║
 ║──────────────────────────────────────────────║
 ║  Version: {BOT_VERSION}                              ║
 ║  Author: {BOT_AUTHOR}                        ║
 ║  Started at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}           ║
-╚══════════════════════════════════════════════╝{Style.RESET_ALL}
+╚══════════════════════════════════════════════╝
 """
-    print(banner)
+    log_info(banner)
 
 # Replace the OpenAI API key setup with OpenRouter configuration
 client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
+    base_url=os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
     api_key=os.environ.get("OPENROUTER_API_KEY"),
     default_headers={
         "HTTP-Referer": "http://localhost:5000",
@@ -101,9 +98,32 @@ client = OpenAI(
     }
 )
 
+# Shared authenticated Reddit client, reused across subreddits and retries
+reddit_session = RedditSession()
+
+# Cached, deduplicated subreddit listings (survive bot restarts)
+listing_fetcher = ListingFetcher(BOT_CONFIG['listing_cache_seconds'])
+
+# Indexed mirror of comment_history.txt (imports the text file on first use)
+history_store = CommentHistoryStore()
+
+# Compact set of recently commented post ids, persisted between runs
+seen_posts = SeenPosts(history_store, max_age_days=BOT_CONFIG['seen_posts_days'])
+
+# Config version the long-lived helpers above were last updated for
+applied_config_version = bot_config.version
+
+def apply_config():
+    """Push reloaded settings into the listing cache and seen posts"""
+    global applied_config_version
+    if bot_config.version == applied_config_version:
+        return
+    listing_fetcher.ttl = BOT_CONFIG['listing_cache_seconds']
+    seen_posts.set_max_age(BOT_CONFIG['seen_posts_days'])
+    applied_config_version = bot_config.version
+
 def load_subreddits():
-    with open('subreddits.txt', 'r') as file:
-        subreddits = [line.strip() for line in file if line.strip()]
+    subreddits = bot_config.subreddits
     log_info(f"Loaded {len(subreddits)} subreddits from subreddits.txt")
     return subreddits
 
@@ -126,22 +146,9 @@ def verify_account_status(reddit):
 
 def get_daily_comment_count():
     """Get number of comments made today"""
-    try:
-        today = datetime.now().date()
-        count = 0
-        with open('comment_history.txt', 'r', encoding='utf-8') as f:
-            for line in f:
-                if '[' in line and ']' in line:
-                    try:
-                        timestamp_str = line[1:20]  # Extract timestamp
-                        comment_date = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S").date()
-                        if comment_date == today:
-                            count += 1
-                    except:
-                        continue
-        return count
-    except FileNotFoundError:
-        return 0
+    with metrics.timed('history_read'):
+        history_store.sync()
+        return history_store.count_today()
 
 def get_chatgpt_answer(prompt):
     """Get response from ChatGPT with bot disclaimer"""
@@ -163,19 +170,20 @@ At the end of your response, casually mention SolverGenie in one of these ways (
 
 Make the SolverGenie mention feel natural and helpful, not promotional. The goal is to genuinely help people while letting them know about a useful resource."""
     
-    response = client.chat.completions.create(
-        model="mistralai/mistral-7b-instruct:free",
-        messages=[
-            {
-                "role": "system",
-                "content": system_prompt
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    )
+    with metrics.timed('llm_completion'):
+        response = client.chat.completions.create(
+            model="mistralai/mistral-7b-instruct:free",
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        )
     return response.choices[0].message.content
 
 def handle_rate_limit(error_message):
@@ -187,8 +195,8 @@ def handle_rate_limit(error_message):
         else:
             sleep_time = BOT_CONFIG['rate_limit_sleep']
         
-        log_warning(f"Rate limited. Sleeping for {sleep_time/60} minutes...")
-        time.sleep(sleep_time)
+        log_warning(f"Rate limited. Sleeping for {sleep_time/60} minutes...", sleep_seconds=sleep_time)
+        sleep(sleep_time, 'rate_limit')
         return True
     except Exception as e:
         log_error(f"Error handling rate limit: {str(e)}")
@@ -220,65 +228,52 @@ def is_valid_post(post):
 
 def load_commented_posts():
     """Load previously commented posts from comment history"""
-    commented_posts = set()
-    try:
-        with open('comment_history.txt', 'r', encoding='utf-8') as f:
-            for line in f:
-                if 'reddit.com/r/' in line:
-                    post_id = line.split('/comments/')[1].split('/')[0]
-                    commented_posts.add(post_id)
-    except FileNotFoundError:
-        pass
-    return commented_posts
+    with metrics.timed('history_read'):
+        history_store.sync()
+        seen_posts.refresh()
+    metrics.set_gauge('bot_seen_posts', len(seen_posts))
+    return seen_posts
 
 def get_reddit_posts(subreddit_name, commented_posts):
     for attempt in range(BOT_CONFIG['max_retries']):
         try:
-            log_info(f"Attempting to connect with username: {os.environ['REDDIT_USERNAME']} (Attempt {attempt + 1})")
+            reddit = reddit_session.get()
             
-            reddit = praw.Reddit(
-                client_id=os.environ["CLIENT_ID"],
-                client_secret=os.environ["CLIENT_SECRET"],
-                password=os.environ["REDDIT_PASSWORD"],
-                user_agent=os.environ["USER_AGENT"],
-                username=os.environ["REDDIT_USERNAME"],
-                ratelimit_seconds=300,
-                check_for_async=False
-            )
-            
-            user = reddit.user.me()
-            log_success(f"Successfully authenticated as: {user.name}")
-            
-            subreddit = reddit.subreddit(subreddit_name)
-            # Get posts from different time periods
+            # Get posts from different time periods, each post only once
             time_filters = ['day', 'week', 'month']
-            all_posts = []
-            
-            for time_filter in time_filters:
-                posts = subreddit.top(limit=BOT_CONFIG['posts_per_request'], time_filter=time_filter)
-                for post in posts:
-                    if post.id not in commented_posts:
-                        all_posts.append(post)
+            all_posts = list(listing_fetcher.iter_posts(
+                reddit,
+                subreddit_name,
+                time_filters,
+                BOT_CONFIG['posts_per_request'],
+                exclude=commented_posts
+            ))
             
             return all_posts
             
         except PrawcoreException as e:
             log_error(f"Reddit API error (Attempt {attempt + 1}): {str(e)}")
+            if is_auth_error(e):
+                reddit_session.invalidate()
             if attempt < BOT_CONFIG['max_retries'] - 1:
-                time.sleep(30)  # Wait 30 seconds before retry
+                metrics.inc('bot_retries_total', operation='reddit_fetch')
+                sleep(30, 'retry')  # Wait 30 seconds before retry
         except Exception as e:
             log_error(f"Unexpected error (Attempt {attempt + 1}): {str(e)}")
             log_error(traceback.format_exc())
             if attempt < BOT_CONFIG['max_retries'] - 1:
-                time.sleep(30)
+                metrics.inc('bot_retries_total', operation='reddit_fetch')
+                sleep(30, 'retry')
     return None
 
 def save_comment_link(subreddit, post_title, comment_link):
     """Save comment link to a file with timestamp"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     try:
-        with open('comment_history.txt', 'a', encoding='utf-8') as f:
-            f.write(f"\n[{timestamp}] r/{subreddit} - {post_title[:50]}...\n{comment_link}\n")
+        with metrics.timed('history_write'):
+            with open('comment_history.txt', 'a', encoding='utf-8') as f:
+                f.write(f"\n[{timestamp}] r/{subreddit} - {post_title[:50]}...\n{comment_link}\n")
+            history_store.sync()
         log_info(f"Comment link saved to comment_history.txt")
     except Exception as e:
         log_error(f"Error saving comment link: {str(e)}")
@@ -300,13 +295,13 @@ def verify_setup():
     """Verify all required files and configurations exist"""
     missing_items = []
     
-    # Check subreddits.txt
-    if not os.path.exists('subreddits.txt'):
+    # Check subreddits.txt and bot_config.json
+    if not os.path.exists(SUBREDDITS_FILE):
         missing_items.append('subreddits.txt')
-    else:
-        with open('subreddits.txt', 'r') as f:
-            if not f.read().strip():
-                missing_items.append('subreddits in subreddits.txt')
+    elif not bot_config.subreddits:
+        missing_items.append('subreddits in subreddits.txt')
+    if bot_config.error:
+        missing_items.append(f'Valid configuration: {bot_config.error}')
     
     # Check environment variables
     required_vars = {
@@ -333,14 +328,19 @@ def verify_setup():
 def main():
     print_banner()
     log_info("Bot initialization started")
+    resume_schedule()
     
     while True:
+        heartbeat.beat()
         try:
+            shutdown.check()
+            apply_config()
+
             # Check daily comment limit
             daily_comments = get_daily_comment_count()
             if daily_comments >= BOT_CONFIG['max_daily_comments']:
                 log_warning(f"Daily comment limit ({BOT_CONFIG['max_daily_comments']}) reached. Waiting until tomorrow...")
-                time.sleep(3600)  # Sleep for an hour before checking again
+                sleep(3600, 'daily_limit')  # Sleep for an hour before checking again
                 continue
                 
             subreddits = load_subreddits()
@@ -351,29 +351,38 @@ def main():
             log_info(f"Currently tracking {len(commented_posts)} commented posts")
             
             for subreddit_name in subreddits:
+                heartbeat.beat()
+                shutdown.check()
                 successful_posts = 0
-                log_info(f"Processing subreddit: r/{subreddit_name}")
+                log_info(f"Processing subreddit: r/{subreddit_name}", subreddit=subreddit_name)
                 
                 reddit_posts = get_reddit_posts(subreddit_name, commented_posts)
                 if reddit_posts is None:
                     continue
 
                 for post in reddit_posts:
+                    heartbeat.beat()
+                    shutdown.check()
                     try:
                         if not is_valid_post(post) or post.id in commented_posts:
                             continue
 
-                        log_info(f"Processing post: {post.title[:50]}...")
+                        log_info(f"Processing post: {post.title[:50]}...", subreddit=subreddit_name, post_id=post.id)
                         
+                        llm_start = time.perf_counter()
                         chatgpt_response = get_chatgpt_answer(post.title)
+                        llm_seconds = round(time.perf_counter() - llm_start, 3)
                         if not chatgpt_response:
                             continue
                             
-                        comment = post.reply(body=chatgpt_response)
+                        reply_start = time.perf_counter()
+                        with metrics.timed('reddit_reply'):
+                            comment = post.reply(body=chatgpt_response)
+                        reply_seconds = round(time.perf_counter() - reply_start, 3)
                         comment_link = f"https://reddit.com{comment.permalink}"
                         
-                        log_success(f"Successfully commented on post in r/{subreddit_name}")
-                        log_success(f"Comment link: {comment_link}")
+                        log_success(f"Successfully commented on post in r/{subreddit_name}", subreddit=subreddit_name, post_id=post.id, llm_seconds=llm_seconds, reply_seconds=reply_seconds)
+                        log_success(f"Comment link: {comment_link}", subreddit=subreddit_name, post_id=post.id, link=comment_link)
                         
                         save_comment_link(subreddit_name, post.title, comment_link)
                         commented_posts.add(post.id)
@@ -382,8 +391,8 @@ def main():
 
                         # Sleep between posts (increased for rate limiting)
                         sleep_time = random.randint(BOT_CONFIG['min_sleep_seconds'], BOT_CONFIG['max_sleep_seconds'])
-                        log_info(f"Sleeping for {sleep_time} seconds...")
-                        time.sleep(sleep_time)
+                        log_info(f"Sleeping for {sleep_time} seconds...", sleep_seconds=sleep_time)
+                        sleep(sleep_time, 'between_posts')
 
                     except Exception as e:
                         error_message = str(e)
@@ -392,28 +401,33 @@ def main():
                                 break
                         else:
                             log_error(f"Error posting comment: {error_message}")
-                            time.sleep(60)  # Wait 1 minute before next attempt
+                            sleep(60, 'error')  # Wait 1 minute before next attempt
 
-                log_success(f"Completed {successful_posts} comments in r/{subreddit_name}")
+                log_success(f"Completed {successful_posts} comments in r/{subreddit_name}", subreddit=subreddit_name, comments=successful_posts)
                 
             log_success(f"Completed cycle #{cycle_count}")
+            log_info(f"Reddit auth round trips: {reddit_session.auth_round_trips} made, {reddit_session.auth_round_trips_saved} saved")
             cycle_count += 1
             
-            log_info(f"Taking a {BOT_CONFIG['cycle_sleep_minutes']}-minute break before starting next cycle...")
-            time.sleep(BOT_CONFIG['cycle_sleep_minutes'] * 60)
+            cycle_sleep = BOT_CONFIG['cycle_sleep_minutes'] * 60
+            log_info(f"Taking a {BOT_CONFIG['cycle_sleep_minutes']}-minute break before starting next cycle...", sleep_seconds=cycle_sleep)
+            sleep(cycle_sleep, 'between_cycles')
             
-        except KeyboardInterrupt:
-            log_info("Bot shutdown initiated by user")
+        except (KeyboardInterrupt, ShutdownRequested):
+            log_info("Bot shutdown initiated")
             return
         except Exception as e:
             log_error(f"Unexpected error in main loop: {str(e)}")
             log_error(traceback.format_exc())
-            time.sleep(300)  # Sleep for 5 minutes before retrying
+            sleep(300, 'error')  # Sleep for 5 minutes before retrying
 
 if __name__ == "__main__":
+    shutdown.install_signal_handlers()
+    profiling.start_profiling()
     try:
-        print("Script starting...")
-        print("Current working directory:", os.getcwd())
+        heartbeat.beat()
+        log_info("Script starting...")
+        log_info(f"Current working directory: {os.getcwd()}")
         print_banner()
         log_info("Starting setup verification...")
         
@@ -422,17 +436,15 @@ if __name__ == "__main__":
             log_error("Setup verification failed. Please fix the issues above and try again.")
             exit(1)
             
-        # Initialize Reddit instance for verification
-        reddit = praw.Reddit(
-            client_id=os.environ["CLIENT_ID"],
-            client_secret=os.environ["CLIENT_SECRET"],
-            password=os.environ["REDDIT_PASSWORD"],
-            user_agent=os.environ["USER_AGENT"],
-            username=os.environ["REDDIT_USERNAME"]
-        )
+        # Authenticate once; the same session is reused by the main loop
+        try:
+            reddit = reddit_session.get()
+        except Exception as e:
+            log_error(f"Error authenticating with Reddit: {str(e)}")
+            reddit = None
         
         # Verify account status
-        if not verify_account_status(reddit):
+        if reddit is None or not verify_account_status(reddit):
             log_error("Account verification failed. Please check the requirements above.")
             exit(1)
         
@@ -446,9 +458,11 @@ if __name__ == "__main__":
         initialize_comment_history()
         
         main()
-    except KeyboardInterrupt:
-        log_info("Bot shutdown initiated by user")
-        print(f"\n{Fore.CYAN}Thank you for using Reddit Bot by {BOT_AUTHOR}!{Style.RESET_ALL}")
+    except (KeyboardInterrupt, ShutdownRequested):
+        log_info("Bot shutdown initiated")
+        log_info(f"Thank you for using Reddit Bot by {BOT_AUTHOR}!")
     except Exception as e:
         log_error(f"Fatal error: {str(e)}")
         log_error(traceback.format_exc())
+    finally:
+        close_state()
@@ -0,0 +1,48 @@
+"""Virtual clock for running the bot's main loop without real waits"""
+import time
+from shutdown import ShutdownRequested
+
+class FakeClock:
+    """Stands in for app.sleep and time.time
+
+    Each sleep moves the virtual clock forward instantly, so TTLs and
+    schedules behave as if the real wait had happened. After `cycles`
+    'between_cycles' sleeps it raises ShutdownRequested, which ends
+    app.main() the same way SIGTERM does.
+    """
+
+    def __init__(self, cycles):
+        self.cycles = cycles
+        self.offset = 0.0
+        self.sleeps = []
+        self.cycle_marks = []
+        self.real_time = time.time
+
+    def time(self):
+        return self.real_time() + self.offset
+
+    def advance(self, seconds):
+        self.offset += seconds
+
+    def sleep(self, seconds, reason):
+        self.sleeps.append((reason, seconds))
+        self.advance(seconds)
+        if reason == 'between_cycles':
+            self.cycle_marks.append(time.perf_counter())
+            if len(self.cycle_marks) >= self.cycles:
+                raise ShutdownRequested()
+
+    def install(self, app_module):
+        """Patch the bot module and the time module; returns an undo function"""
+        original_sleep = app_module.sleep
+        app_module.sleep = self.sleep
+        time.time = self.time
+
+        def uninstall():
+            app_module.sleep = original_sleep
+            time.time = self.real_time
+        return uninstall
+
+    @property
+    def virtual_seconds(self):
+        return sum(seconds for _, seconds in self.sleeps)
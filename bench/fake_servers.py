@@ -0,0 +1,202 @@
+"""Local stand-ins for the Reddit API and the OpenAI-compatible LLM endpoint
+
+Both run on 127.0.0.1 in a background thread. praw is pointed at the fake
+Reddit through the oauth_url / reddit_url settings of RedditSession and the
+OpenAI client through OPENROUTER_BASE_URL, so app.py runs unmodified and
+never touches the network.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class FakeServer:
+    """Runs a request handler class on a random local port"""
+
+    def __init__(self, handler_class, latency=0.0):
+        # A fresh subclass per server so request logs and counters start empty
+        self.handler_class = type(handler_class.__name__, (handler_class,), {
+            'latency': latency,
+            'requests': [],
+            'comment_count': 0,
+            'listing_fetches': {}
+        })
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self.handler_class)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.handler_class.requests
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class JsonHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests = []
+    comment_count = 0
+    listing_fetches = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length).decode('utf-8') if length else ''
+
+    def record(self, method):
+        self.requests.append((method, urlparse(self.path).path))
+        if self.latency:
+            time.sleep(self.latency)
+
+def _post_id(subreddit, time_filter, index, generation):
+    # Listings overlap like the real ones: 'week' repeats half of 'day',
+    # 'month' repeats half of 'week', and each refetch of the same listing
+    # brings in half a page of new posts
+    offset = {'day': 0, 'week': 5, 'month': 10}.get(time_filter, 0) + generation * 5
+    return f"{subreddit.lower()[:4]}{offset + index:x}"
+
+class FakeRedditHandler(JsonHandler):
+    """The handful of Reddit endpoints app.py uses"""
+
+    username = 'benchbot'
+
+    def do_POST(self):
+        self.record('POST')
+        path = urlparse(self.path).path
+        form = parse_qs(self.read_body())
+
+        if path.rstrip('/') == '/api/v1/access_token':
+            self.send_json({
+                'access_token': 'bench-token',
+                'token_type': 'bearer',
+                'expires_in': 3600,
+                'scope': '*'
+            })
+        elif path.rstrip('/') == '/api/comment':
+            type(self).comment_count += 1
+            parent = form.get('thing_id', ['t3_unknown'])[0]
+            comment_id = f"c{self.comment_count:x}"
+            self.send_json({'json': {'errors': [], 'data': {'things': [{
+                'kind': 't1',
+                'data': {
+                    'id': comment_id,
+                    'name': f"t1_{comment_id}",
+                    'body': form.get('text', [''])[0],
+                    'parent_id': parent,
+                    'link_id': parent,
+                    'permalink': f"/r/bench/comments/{parent[3:]}/post/{comment_id}/"
+                }
+            }]}}})
+        else:
+            self.send_json({'error': 404}, status=404)
+
+    def do_GET(self):
+        self.record('GET')
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path.rstrip('/') == '/api/v1/me':
+            self.send_json({
+                'name': self.username,
+                'id': 'bench1',
+                'created_utc': time.time() - 86400 * 30,
+                'link_karma': 1,
+                'comment_karma': 1
+            })
+            return
+
+        match = re.match(r'^/user/([^/]+)/about/?$', url.path)
+        if match:
+            self.send_json({'kind': 't2', 'data': {
+                'name': match.group(1),
+                'id': 'bench1',
+                'created_utc': time.time() - 86400 * 30,
+                'link_karma': 1,
+                'comment_karma': 1
+            }})
+            return
+
+        match = re.match(r'^/r/([^/]+)/top/?$', url.path)
+        if match:
+            subreddit = match.group(1)
+            time_filter = query.get('t', ['day'])[0]
+            limit = int(query.get('limit', ['10'])[0])
+            generation = self.listing_fetches.get((subreddit, time_filter), 0)
+            self.listing_fetches[(subreddit, time_filter)] = generation + 1
+            children = []
+            for index in range(limit):
+                post_id = _post_id(subreddit, time_filter, index, generation)
+                children.append({'kind': 't3', 'data': {
+                    'id': post_id,
+                    'name': f"t3_{post_id}",
+                    'title': f"How do I solve problem {post_id}?",
+                    'score': 50,
+                    'locked': False,
+                    'archived': False,
+                    'stickied': False,
+                    'over_18': False,
+                    'subreddit': subreddit,
+                    'author': 'someone',
+                    'permalink': f"/r/{subreddit}/comments/{post_id}/post/",
+                    'created_utc': time.time() - 3600,
+                    'num_comments': 3
+                }})
+            self.send_json({'kind': 'Listing', 'data': {
+                'children': children,
+                'after': None,
+                'before': None
+            }})
+            return
+
+        self.send_json({'error': 404}, status=404)
+
+class FakeLLMHandler(JsonHandler):
+    """OpenAI-compatible /chat/completions returning a canned answer"""
+
+    def do_POST(self):
+        self.record('POST')
+        request = json.loads(self.read_body() or '{}')
+        if not urlparse(self.path).path.endswith('/chat/completions'):
+            self.send_json({'error': 404}, status=404)
+            return
+        self.send_json({
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'bench'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': 'A helpful benchmark answer.'},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+        })
+
+def start_fake_reddit(latency=0.0):
+    return FakeServer(FakeRedditHandler, latency).start()
+
+def start_fake_llm(latency=0.0):
+    return FakeServer(FakeLLMHandler, latency).start()
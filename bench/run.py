@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""Offline benchmarks for the bot and the dashboard
+
+Runs everything in a scratch directory with its own HOME, against local
+fake Reddit and LLM servers, so no credentials or network are needed and
+the real ~/redditbot state is never touched. Each measurement runs in a
+fresh Python process, the way the bot and web workers start.
+
+    python bench/run.py                         # 10k, 100k and 1M entries
+    python bench/run.py --sizes 10000 --cycles 3
+
+Results are appended to bench/results.jsonl with the git commit they were
+measured on, and compared against the previous run.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_FILE = os.path.join(BENCH_DIR, 'results.jsonl')
+
+# Run as a script, so make the bot modules and the bench package importable
+sys.path.insert(0, REPO_DIR)
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+BENCH_SUBREDDITS = ['learnpython', 'askscience', 'homeworkhelp']
+
+# Placeholder credentials; the fake servers accept anything
+BENCH_ENV = {
+    'REDDIT_USERNAME': 'benchbot',
+    'REDDIT_PASSWORD': 'bench',
+    'CLIENT_ID': 'benchclient',
+    'CLIENT_SECRET': 'bench',
+    'USER_AGENT': 'redditbot-bench/1.0',
+    'OPENROUTER_API_KEY': 'bench',
+    'BOT_LOG_FORMAT': 'json',
+    'BOT_PROFILE': '0'
+}
+
+def median_ms(timings):
+    return round(statistics.median(timings) * 1000, 3)
+
+def timed_ms(func):
+    started = time.perf_counter()
+    result = func()
+    return round((time.perf_counter() - started) * 1000, 3), result
+
+# ---------------------------------------------------------------------------
+# Probes: run inside a scratch directory in a fresh interpreter
+# ---------------------------------------------------------------------------
+
+def probe_history(args):
+    """Cost of load_commented_posts() and get_daily_comment_count()"""
+    import_ms, app = timed_ms(lambda: __import__('app'))
+    result = {'import_ms': import_ms}
+
+    result['load_commented_posts_first_ms'], commented_posts = timed_ms(app.load_commented_posts)
+    result['get_daily_comment_count_first_ms'], result['daily_count'] = timed_ms(app.get_daily_comment_count)
+
+    warm = [timed_ms(app.load_commented_posts)[0] / 1000 for _ in range(args.repeat)]
+    result['load_commented_posts_warm_ms'] = median_ms(warm)
+    warm = [timed_ms(app.get_daily_comment_count)[0] / 1000 for _ in range(args.repeat)]
+    result['get_daily_comment_count_warm_ms'] = median_ms(warm)
+
+    # Membership checks as the main loop does them, hits and misses
+    from bench.synth import base36
+    ids = [base36(36 ** 5 + index * 7) for index in range(0, 2000, 2)]
+    ids += [f"zz{index}" for index in range(1000)]
+    started = time.perf_counter()
+    for post_id in ids:
+        post_id in commented_posts
+    result['contains_us'] = round((time.perf_counter() - started) / len(ids) * 1e6, 3)
+    result['tracked_posts'] = len(commented_posts)
+    app.close_state()
+    return result
+
+def probe_stats(args):
+    """/api/stats latency: first request, warm cache and conditional 304"""
+    import_ms, web_server = timed_ms(lambda: __import__('web_server'))
+    client = web_server.create_app(start_bot=False).test_client()
+    result = {'import_ms': import_ms}
+
+    result['first_ms'], response = timed_ms(lambda: client.get('/api/stats'))
+    etag = response.headers.get('ETag')
+    result['total_comments'] = response.get_json()['total_comments']
+
+    warm = [timed_ms(lambda: client.get('/api/stats'))[0] / 1000 for _ in range(args.repeat)]
+    result['warm_ms'] = median_ms(warm)
+    if etag:
+        headers = {'If-None-Match': etag}
+        cached = [timed_ms(lambda: client.get('/api/stats', headers=headers))[0] / 1000
+                  for _ in range(args.repeat)]
+        result['not_modified_ms'] = median_ms(cached)
+    return result
+
+def probe_cycle(args):
+    """Wall time of full bot cycles against the fake servers"""
+    from bench.clock import FakeClock
+    from bench.fake_servers import start_fake_llm, start_fake_reddit
+
+    reddit_server = start_fake_reddit(args.latency)
+    llm_server = start_fake_llm(args.latency)
+    os.environ['OPENROUTER_BASE_URL'] = llm_server.url
+
+    with open('subreddits.txt', 'w') as f:
+        f.write('\n'.join(BENCH_SUBREDDITS) + '\n')
+    with open('bot_config.json', 'w') as f:
+        json.dump({'max_daily_comments': 10 ** 9}, f)
+
+    import app
+    from reddit_session import RedditSession
+    app.reddit_session = RedditSession(oauth_url=reddit_server.url, reddit_url=reddit_server.url)
+    clock = FakeClock(args.cycles)
+    uninstall = clock.install(app)
+    try:
+        started = time.perf_counter()
+        app.main()
+    finally:
+        uninstall()
+        app.close_state()
+        reddit_server.stop()
+        llm_server.stop()
+
+    marks = [started] + clock.cycle_marks
+    cycles = [end - start for start, end in zip(marks, marks[1:])]
+    comments = reddit_server.handler_class.comment_count
+    return {
+        'cycles': len(cycles),
+        'first_cycle_ms': round(cycles[0] * 1000, 3) if cycles else None,
+        'cycle_ms': median_ms(cycles[1:] or cycles) if cycles else None,
+        'comments': comments,
+        'reddit_requests': len(reddit_server.requests),
+        'llm_requests': len(llm_server.requests),
+        'virtual_hours': round(clock.virtual_seconds / 3600, 1)
+    }
+
+PROBES = {
+    'history': probe_history,
+    'stats': probe_stats,
+    'cycle': probe_cycle
+}
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def scratch_env(scratch):
+    env = dict(os.environ)
+    env.update(BENCH_ENV)
+    env['HOME'] = os.path.join(scratch, 'home')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_DIR, env.get('PYTHONPATH')]))
+    os.makedirs(env['HOME'], exist_ok=True)
+    return env
+
+def run_probe(name, scratch, args, **options):
+    """Run a probe in a fresh interpreter inside `scratch` and return its result"""
+    out_path = os.path.join(scratch, f"{name}-result.json")
+    command = [sys.executable, os.path.abspath(__file__), '--probe', name, '--out', out_path,
+               '--repeat', str(args.repeat), '--cycles', str(args.cycles),
+               '--latency', str(args.latency)]
+    process = subprocess.run(command, cwd=scratch, env=scratch_env(scratch),
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Probe {name} failed:\n{process.stderr[-4000:]}")
+    with open(out_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def measure_startup(scratch, args):
+    """Interpreter start plus import of the bot and the dashboard"""
+    env = scratch_env(scratch)
+    result = {}
+    for label, code in [('python', 'pass'), ('app', 'import app'), ('web_server', 'import web_server')]:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], cwd=scratch, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - started)
+        result[f"{label}_ms"] = median_ms(timings)
+    return result
+
+def measure_history_size(size, args):
+    """History and stats costs for one history size, cold and after restart"""
+    from bench.synth import write_history
+
+    scratch = tempfile.mkdtemp(prefix=f"redditbot-bench-{size}-")
+    try:
+        started = time.perf_counter()
+        write_history(os.path.join(scratch, 'comment_history.txt'), size)
+        print(f"  generated {size} entries in {time.perf_counter() - started:.1f}s")
+
+        result = {
+            'history_bytes': os.path.getsize(os.path.join(scratch, 'comment_history.txt')),
+            # First run after an upgrade: the store imports the whole file
+            'history_first_run': run_probe('history', scratch, args),
+            # Every later bot start: the store is already in sync
+            'history_restart': run_probe('history', scratch, args),
+            'stats': run_probe('stats', scratch, args)
+        }
+        print(f"  history and /api/stats measured")
+        return result
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def measure_cycles(args):
+    from bench.synth import write_history
+
+    scratch = tempfile.mkdtemp(prefix='redditbot-bench-cycle-')
+    try:
+        write_history(os.path.join(scratch, 'comment_history.txt'), args.cycle_history)
+        return run_probe('cycle', scratch, args)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+def flatten(result, prefix=''):
+    """{'a': {'b_ms': 1}} -> {'a.b_ms': 1}, numbers only"""
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def load_previous(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+def print_comparison(current, previous):
+    current_flat = flatten(current['results'])
+    previous_flat = flatten(previous['results']) if previous else {}
+    if previous:
+        print(f"\nCompared with {previous['revision']} ({previous['timestamp']}):")
+    width = max(len(name) for name in current_flat)
+    for name, value in current_flat.items():
+        line = f"  {name:<{width}}  {value:>12}"
+        old = previous_flat.get(name)
+        if old is not None and name.endswith(('_ms', '_us')):
+            change = (value - old) / old * 100 if old else 0.0
+            line += f"  {old:>12}  {change:+7.1f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='comma-separated history sizes (entries)')
+    parser.add_argument('--repeat', type=int, default=5, help='repetitions for warm timings')
+    parser.add_argument('--cycles', type=int, default=3, help='bot cycles to run against the fakes')
+    parser.add_argument('--cycle-history', type=int, default=10000,
+                        help='history entries present during the cycle benchmark')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds of simulated latency per fake API request')
+    parser.add_argument('--results', default=RESULTS_FILE, help='results file to append to')
+    parser.add_argument('--label', help='note stored with the results')
+    parser.add_argument('--no-save', action='store_true', help='print results without saving them')
+    parser.add_argument('--probe', choices=sorted(PROBES), help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        result = PROBES[args.probe](args)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = {}
+
+    print("Measuring startup...")
+    scratch = tempfile.mkdtemp(prefix='redditbot-bench-startup-')
+    try:
+        results['startup'] = measure_startup(scratch, args)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"Measuring {args.cycles} bot cycles against the fake servers...")
+    results['cycle'] = measure_cycles(args)
+
+    for size in sizes:
+        print(f"Measuring history of {size} entries...")
+        results[f"history_{size}"] = measure_history_size(size, args)
+
+    record = {
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'revision': git_revision(),
+        'label': args.label,
+        'python': sys.version.split()[0],
+        'results': results
+    }
+    print_comparison(record, load_previous(args.results))
+
+    if not args.no_save:
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        print(f"\nResults appended to {args.results}")
+
+if __name__ == '__main__':
+    main()
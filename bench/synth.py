@@ -0,0 +1,57 @@
+"""Synthetic comment_history.txt files in the exact format the bot writes"""
+import random
+from datetime import datetime, timedelta
+
+SUBREDDITS = [
+    'learnpython', 'askscience', 'explainlikeimfive', 'homeworkhelp',
+    'learnmath', 'AskPhysics', 'chemistry', 'AskHistorians'
+]
+
+HEADER = (
+    "🤖 RedditGPT Comment History 🤖\n"
+    "================================\n"
+    "Bot Started: {started}\n"
+    "================================\n"
+)
+
+def base36(number):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    text = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        text = digits[remainder] + text
+        if not number:
+            return text
+
+def write_history(path, entries, days=365, today=5, seed=1):
+    """Write `entries` comments spread over the last `days` days
+
+    The last `today` entries are dated today so the daily count has
+    something to find. Post ids are unique and increase with time like
+    real ones.
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(days=days)
+    midnight = now.replace(hour=0, minute=0, second=0)
+    older = max(entries - today, 0)
+    step = (midnight - start).total_seconds() / max(older, 1)
+    first_post = 36 ** 5
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HEADER.format(started=start.strftime('%Y-%m-%d %H:%M:%S')))
+        for index in range(entries):
+            if index < older:
+                when = start + timedelta(seconds=int(index * step))
+            else:
+                when = midnight + timedelta(seconds=index - older)
+            subreddit = rng.choice(SUBREDDITS)
+            post_id = base36(first_post + index * 7)
+            comment_id = base36(first_post * 36 + index)
+            title = f"Question {index} about something in r/{subreddit} that needs an answer"
+            f.write(f"\n[{when.strftime('%Y-%m-%d %H:%M:%S')}] r/{subreddit} - {title[:50]}...\n")
+            f.write(f"https://reddit.com/r/{subreddit}/comments/{post_id}/question_{index}/{comment_id}/\n")
+
+if __name__ == '__main__':
+    import sys
+    write_history(sys.argv[1], int(sys.argv[2]))
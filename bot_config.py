@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping
+from file_watch import file_signature
+
+CONFIG_FILE = 'bot_config.json'
+SUBREDDITS_FILE = 'subreddits.txt'
+
+# Files are stat'ed at most this often, however hot the caller
+CHECK_INTERVAL = 1.0
+
+# Settings used when bot_config.json is missing or leaves them out
+DEFAULT_CONFIG = {
+    'max_comments_per_subreddit': 1,
+    'min_sleep_seconds': 3600,    # 1 hour minimum between comments
+    'max_sleep_seconds': 7200,    # 2 hours maximum between comments
+    'cycle_sleep_minutes': 180,   # 3 hours between cycles
+    'rate_limit_sleep': 3600,     # 1 hour when rate limited
+    'max_retries': 3,
+    'min_post_score': 10,         # Reduced minimum score requirement
+    'blacklisted_phrases': [
+        '[removed]', '[deleted]', 'mod post', 'moderator', 'announcement',
+        'sticky', 'megathread'
+    ],
+    'max_title_length': 300,
+    'posts_per_request': 10,      # Reduced from 25 for new accounts
+    'listing_cache_seconds': 1800, # Reuse fetched listings for 30 minutes
+    'seen_posts_days': 35,        # Forget commented posts older than the 'month' listing
+    'max_daily_comments': 10,     # New: limit daily comments
+    'account_age_days': 0,        # Changed to 0 to allow new accounts
+    'min_karma': 0               # Changed to 0 to allow new accounts
+}
+
+# top('month') can return posts up to 31 days old, so forgetting commented
+# posts any sooner would let the bot comment on them again
+MIN_SEEN_POSTS_DAYS = 31
+# Keeps the cutoff date and the snapshot header field in range
+MAX_SEEN_POSTS_DAYS = 3650
+MIN_LISTING_CACHE_SECONDS = 60
+
+# Looser than Reddit's current 21-character rule, which some older
+# subreddits predate
+SUBREDDIT_NAME = re.compile(r'^[A-Za-z0-9_]{2,50}$')
+
+logger = logging.getLogger('redditbot')
+
+class ConfigError(Exception):
+    pass
+
+def validate_config(values):
+    """Raise ConfigError listing every problem with a set of settings"""
+    problems = []
+    for key, value in values.items():
+        if key not in DEFAULT_CONFIG:
+            problems.append(f"unknown setting '{key}'")
+        elif isinstance(DEFAULT_CONFIG[key], list):
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                problems.append(f"'{key}' must be a list of strings")
+        elif not isinstance(value, int) or isinstance(value, bool):
+            problems.append(f"'{key}' must be a whole number")
+        elif value < 0:
+            problems.append(f"'{key}' must not be negative")
+    if problems:
+        raise ConfigError('; '.join(problems))
+
+    if values['min_sleep_seconds'] > values['max_sleep_seconds']:
+        raise ConfigError("'min_sleep_seconds' is larger than 'max_sleep_seconds'")
+    if values['max_retries'] < 1:
+        raise ConfigError("'max_retries' must be at least 1")
+    if not 1 <= values['posts_per_request'] <= 100:
+        raise ConfigError("'posts_per_request' must be between 1 and 100")
+    if not MIN_SEEN_POSTS_DAYS <= values['seen_posts_days'] <= MAX_SEEN_POSTS_DAYS:
+        raise ConfigError(
+            f"'seen_posts_days' must be between {MIN_SEEN_POSTS_DAYS} and {MAX_SEEN_POSTS_DAYS}"
+        )
+    if values['listing_cache_seconds'] < MIN_LISTING_CACHE_SECONDS:
+        raise ConfigError(f"'listing_cache_seconds' must be at least {MIN_LISTING_CACHE_SECONDS}")
+
+def parse_subreddits(text):
+    """Subreddit names from subreddits.txt, one per line
+
+    Lines that are not valid names are logged and skipped rather than
+    discarding the whole list.
+    """
+    subreddits = []
+    for line in text.splitlines():
+        name = line.strip()
+        if not name:
+            continue
+        if SUBREDDIT_NAME.match(name):
+            subreddits.append(name)
+        else:
+            logger.warning(f"Skipping invalid subreddit name in subreddits.txt: {name!r}")
+    return subreddits
+
+class BotConfig(Mapping):
+    """Bot settings and subreddit list, reloaded when their files change
+
+    Reads like the old BOT_CONFIG dict. The files are only re-read when
+    their inode, size or mtime change, and a change that fails validation
+    is logged and ignored, keeping the last good settings. `version` goes
+    up on every accepted change, so caches built from the config can
+    include it in their keys.
+    """
+
+    def __init__(self, config_path=CONFIG_FILE, subreddits_path=SUBREDDITS_FILE,
+                 check_interval=CHECK_INTERVAL):
+        self.config_path = config_path
+        self.subreddits_path = subreddits_path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.values = dict(DEFAULT_CONFIG)
+        self._subreddits = []
+        self._version = 0
+        self.error = None
+        self.signatures = None
+        self.next_check = 0
+
+    def __getitem__(self, key):
+        return self.current()[key]
+
+    def __iter__(self):
+        return iter(self.current())
+
+    def __len__(self):
+        return len(self.current())
+
+    def current(self):
+        """The settings dict, after reloading it if its file changed"""
+        self.check()
+        return self.values
+
+    @property
+    def subreddits(self):
+        self.check()
+        return self._subreddits
+
+    @property
+    def version(self):
+        """Bumped on every accepted change, after reloading if a file changed"""
+        self.check()
+        return self._version
+
+    def check(self):
+        """Reload the files if they changed; at most once per check_interval"""
+        now = time.monotonic()
+        if now < self.next_check:
+            return
+        with self.lock:
+            self.next_check = now + self.check_interval
+            signatures = (file_signature(self.config_path), file_signature(self.subreddits_path))
+            if signatures != self.signatures:
+                self.signatures = signatures
+                self._reload()
+
+    def _reload(self):
+        try:
+            values = dict(DEFAULT_CONFIG)
+            if os.path.exists(self.config_path):
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    overrides = json.load(f)
+                if not isinstance(overrides, dict):
+                    raise ConfigError("expected a JSON object of settings")
+                values.update(overrides)
+            validate_config(values)
+
+            subreddits = []
+            if os.path.exists(self.subreddits_path):
+                with open(self.subreddits_path, 'r', encoding='utf-8') as f:
+                    subreddits = parse_subreddits(f.read())
+        except (OSError, ValueError, ConfigError) as e:
+            self.error = str(e)
+            logger.error(f"Ignoring invalid configuration ({self.error}), keeping version {self._version}")
+            return
+
+        self.error = None
+        if values != self.values or subreddits != self._subreddits or self._version == 0:
+            self.values = values
+            self._subreddits = subreddits
+            self._version += 1
+            if self._version > 1:
+                logger.info(f"Configuration reloaded (version {self._version})")
+
+bot_config = BotConfig()
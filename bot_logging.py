@@ -0,0 +1,209 @@
+import atexit
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from colorama import Fore, Style
+
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+LOG_DIR = os.path.join(os.path.expanduser('~'), 'redditbot', 'logs')
+LOG_FILE = os.path.join(LOG_DIR, 'bot.log')
+
+LEVEL_COLORS = {
+    'INFO': Fore.CYAN,
+    'SUCCESS': Fore.GREEN,
+    'WARNING': Fore.YELLOW,
+    'ERROR': Fore.RED,
+    'CRITICAL': Fore.RED
+}
+
+class TextFormatter(logging.Formatter):
+    """'[LEVEL] timestamp - message', the format the bot has always logged"""
+
+    def __init__(self):
+        super().__init__("[%(levelname)s] %(asctime)s - %(message)s", TIMESTAMP_FORMAT)
+
+class ColorFormatter(TextFormatter):
+    def format(self, record):
+        color = LEVEL_COLORS.get(record.levelname, '')
+        return f"{color}{super().format(record)}{Style.RESET_ALL}"
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with any structured fields merged in"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).strftime(TIMESTAMP_FORMAT),
+            'level': record.levelname,
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        return json.dumps(entry, default=str)
+
+class BatchedRotatingFileHandler(logging.FileHandler):
+    """File handler that leaves flushing to the listener and rotates itself
+
+    Rotation happens when the file exceeds max_bytes or is older than
+    rotate_seconds. Rotated files are gzipped and only the newest
+    backup_count are kept.
+    """
+
+    def __init__(self, filename, max_bytes, rotate_seconds, backup_count):
+        super().__init__(filename, mode='a', encoding='utf-8', delay=True)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        try:
+            self.opened_at = os.path.getmtime(self.baseFilename)
+        except OSError:
+            self.opened_at = time.time()
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.should_rollover():
+                self.do_rollover()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def should_rollover(self):
+        if self.max_bytes and self.stream.tell() >= self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self.opened_at >= self.rotate_seconds
+
+    def do_rollover(self):
+        self.stream.close()
+        rotated = f"{self.baseFilename}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        if os.path.exists(self.baseFilename):
+            os.replace(self.baseFilename, rotated)
+            with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+        backups = sorted(glob.glob(f"{glob.escape(self.baseFilename)}.*.gz"))
+        for old in backups[:-self.backup_count] if self.backup_count else []:
+            os.remove(old)
+
+        self.stream = self._open()
+        self.opened_at = time.time()
+
+class BatchingQueueListener:
+    """Drains the log queue on a background thread in batches
+
+    Each batch is written to every handler and then flushed once, so the
+    bot's main loop never waits on console or disk I/O.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_queue, handlers, batch_size=256):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = False
+            for record in batch:
+                if record is self._STOP:
+                    stopping = True
+                    continue
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            for handler in self.handlers:
+                handler.flush()
+            if stopping:
+                return
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.queue.put(self._STOP)
+        self.thread.join()
+        self.thread = None
+        for handler in self.handlers:
+            handler.close()
+
+def setup_logging(log_dir, name='redditbot'):
+    """Configure the bot logger and return it
+
+    Environment overrides:
+      BOT_LOG_FORMAT       'text' (default) or 'json' for the log file
+      BOT_LOG_MAX_BYTES    rotate bot.log past this size (default 10 MB)
+      BOT_LOG_ROTATE_HOURS rotate bot.log after this many hours (default 24)
+      BOT_LOG_BACKUPS      number of compressed logs to keep (default 7)
+    """
+    os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = BatchedRotatingFileHandler(
+        os.path.join(log_dir, 'bot.log'),
+        max_bytes=int(os.environ.get('BOT_LOG_MAX_BYTES', 10 * 1024 * 1024)),
+        rotate_seconds=float(os.environ.get('BOT_LOG_ROTATE_HOURS', 24)) * 3600,
+        backup_count=int(os.environ.get('BOT_LOG_BACKUPS', 7))
+    )
+    if os.environ.get('BOT_LOG_FORMAT', 'text').lower() == 'json':
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(TextFormatter())
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(ColorFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = BatchingQueueListener(log_queue, [console_handler, file_handler])
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    # Library warnings used to reach bot.log through the stderr tee
+    logging.captureWarnings(True)
+    logging.getLogger('py.warnings').addHandler(logging.handlers.QueueHandler(log_queue))
+
+    # So did tracebacks of uncaught exceptions
+    def log_uncaught(exc_type, exc_value, exc_traceback):
+        if issubclass(exc_type, KeyboardInterrupt):
+            sys.__excepthook__(exc_type, exc_value, exc_traceback)
+            return
+        logger.critical("Uncaught exception", exc_info=(exc_type, exc_value, exc_traceback))
+
+    def log_uncaught_in_thread(args):
+        if args.exc_type is SystemExit:
+            return
+        thread_name = args.thread.name if args.thread else 'unknown'
+        logger.critical(f"Uncaught exception in thread {thread_name}",
+                        exc_info=(args.exc_type, args.exc_value, args.exc_traceback))
+
+    sys.excepthook = log_uncaught
+    threading.excepthook = log_uncaught_in_thread
+    return logger
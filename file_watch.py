@@ -0,0 +1,111 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+def file_signature(path):
+    """Cheap change marker for a file: (inode, size, mtime), or None if missing"""
+    try:
+        st = os.stat(path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class FileWatcher:
+    """Block until a file changes, via inotify with an mtime-poll fallback
+
+    The parent directory is watched rather than the file itself, so the
+    watch survives the file being created, replaced or rotated.
+    """
+
+    def __init__(self, path, poll_interval=1.0):
+        self.path = os.path.abspath(path)
+        self.name = os.path.basename(self.path).encode()
+        self.poll_interval = poll_interval
+        self.fd = None
+        self.signature = file_signature(self.path)
+
+        libc = _load_libc()
+        if libc is not None:
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd >= 0:
+                wd = libc.inotify_add_watch(fd, os.path.dirname(self.path).encode(), WATCH_MASK)
+                if wd >= 0:
+                    self.fd = fd
+                else:
+                    os.close(fd)
+
+    @property
+    def backend(self):
+        return 'inotify' if self.fd is not None else 'poll'
+
+    def wait(self, timeout):
+        """Return True if the file changed within `timeout` seconds"""
+        if self.fd is not None:
+            return self._wait_inotify(timeout)
+        return self._wait_poll(timeout)
+
+    def _wait_inotify(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return False
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            changed = False
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                _, _, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b'\0')
+                offset += name_len
+                if name == self.name:
+                    changed = True
+            if changed:
+                self.signature = file_signature(self.path)
+                return True
+
+    def _wait_poll(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            signature = file_signature(self.path)
+            if signature != self.signature:
+                self.signature = signature
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
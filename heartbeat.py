@@ -0,0 +1,31 @@
+import os
+import time
+
+HEARTBEAT_FILE = os.environ.get(
+    'BOT_HEARTBEAT_FILE',
+    os.path.join(os.path.expanduser('~'), 'redditbot', 'heartbeat')
+)
+
+# The bot beats at least this often while it is sleeping
+HEARTBEAT_INTERVAL = 30
+
+def beat(path=HEARTBEAT_FILE):
+    """Tell the supervisor the bot's main loop is still making progress"""
+    try:
+        with open(path, 'w') as f:
+            f.write(f"{os.getpid()} {time.time()}\n")
+    except OSError:
+        pass
+
+def heartbeat_age(path=HEARTBEAT_FILE):
+    """Seconds since the last beat, or None if the bot never beat"""
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+def clear(path=HEARTBEAT_FILE):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,321 @@
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from reverse_reader import iter_lines_reverse
+
+HISTORY_FILE = 'comment_history.txt'
+HISTORY_DB = 'comment_history.db'
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id TEXT,
+    subreddit TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL UNIQUE,
+    commented_at TEXT NOT NULL,
+    comment_date TEXT NOT NULL,
+    file_offset INTEGER NOT NULL
+);
+-- Dedup lookups moved to seen_posts.SeenPosts; the post_id index only
+-- slowed down inserts
+DROP INDEX IF EXISTS idx_comments_post_id;
+CREATE INDEX IF NOT EXISTS idx_comments_date ON comments (comment_date);
+CREATE INDEX IF NOT EXISTS idx_comments_subreddit ON comments (subreddit, file_offset);
+CREATE INDEX IF NOT EXISTS idx_comments_time ON comments (commented_at, file_offset);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def parse_header_line(line):
+    """Parse a '[timestamp] r/subreddit - title' history line"""
+    timestamp = line[1:20]
+    subreddit = line.split('r/')[1].split(' -')[0] if 'r/' in line else 'unknown'
+    title = line.split(' - ', 1)[1].strip() if ' - ' in line else ''
+    return {
+        'time': timestamp,
+        'subreddit': subreddit,
+        'title': title
+    }
+
+def extract_post_id(link):
+    """Get the base36 post id from a comment permalink"""
+    if '/comments/' not in link:
+        return None
+    return link.split('/comments/')[1].split('/')[0]
+
+def parse_history_bytes(data, base_offset=0):
+    """Parse complete entries out of a chunk of comment_history.txt
+
+    Returns (entries, consumed) where consumed is the number of bytes that
+    can safely be skipped next time. It never moves past a partial line or
+    past a header line whose link has not been written yet, so a reader
+    racing save_comment_link() simply picks that entry up on its next call.
+    """
+    entries = []
+    pending = None
+    consumed = 0
+    start = 0
+    while True:
+        end = data.find(b'\n', start)
+        if end == -1:
+            break
+        line = data[start:end].decode('utf-8', errors='replace').rstrip('\r')
+        line_offset = start
+        start = end + 1
+
+        if line.startswith('[') and ']' in line:
+            # This is a timestamp line with subreddit
+            pending = parse_header_line(line)
+            pending['offset'] = base_offset + line_offset
+        elif line.startswith('http') and pending is not None:
+            # This is the comment link that completes the entry
+            pending['link'] = line.strip()
+            pending['post_id'] = extract_post_id(pending['link'])
+            entries.append(pending)
+            pending = None
+            consumed = start
+        elif pending is None:
+            consumed = start
+    return entries, consumed
+
+def read_file_head(path, size=256):
+    """First bytes of a file, used to spot a file rewritten in place"""
+    with open(path, 'rb') as f:
+        return f.read(size)
+
+def head_changed(old_head, new_head):
+    """Whether the file start differs from what we saw (appends don't count)"""
+    return old_head is None or new_head[:len(old_head)] != old_head
+
+def read_history_entries(path, offset=0):
+    """Read entries appended to the history file after a byte offset"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    entries, consumed = parse_history_bytes(data, offset)
+    return entries, offset + consumed
+
+def iter_history_reverse(path, before=None):
+    """Yield history entries newest first, starting before a byte offset"""
+    link = None
+    for offset, raw in iter_lines_reverse(path, before):
+        line = raw.decode('utf-8', errors='replace').rstrip('\r')
+        if line.startswith('http'):
+            link = line.strip()
+        elif line.startswith('[') and ']' in line:
+            if link is not None:
+                entry = parse_header_line(line)
+                entry['offset'] = offset
+                entry['link'] = link
+                entry['post_id'] = extract_post_id(link)
+                yield entry
+            link = None
+
+class HistoryTailReader:
+    """Keeps parsed history entries in memory and only reads appended bytes
+
+    The byte offset and inode of the last parse are remembered; the file is
+    reparsed from scratch only when it has been truncated or replaced.
+    """
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = []
+        self.offset = 0
+        self.inode = None
+        self.head = None
+        # Bumped on every full reparse so callers holding indexes into
+        # `entries` know to start over
+        self.generation = 0
+
+    def read(self):
+        """Return all entries parsed so far, after picking up new ones"""
+        with self.lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                if self.entries or self.offset:
+                    self._reset()
+                return self.entries
+
+            head = read_file_head(self.path)
+            if st.st_ino != self.inode or st.st_size < self.offset or head_changed(self.head, head):
+                self._reset()
+                self.inode = st.st_ino
+            self.head = head
+            if st.st_size > self.offset:
+                entries, self.offset = read_history_entries(self.path, self.offset)
+                self.entries.extend(entries)
+            return self.entries
+
+    def _reset(self):
+        self.entries = []
+        self.offset = 0
+        self.inode = None
+        self.head = None
+        self.generation += 1
+
+class CommentHistoryStore:
+    """SQLite index over comment_history.txt
+
+    The text file stays the append-only record that save_comment_link()
+    writes; the database mirrors it so dedup checks and daily counts are
+    indexed lookups instead of full rescans. Only bytes appended since the
+    last sync are parsed.
+    """
+
+    def __init__(self, db_path=HISTORY_DB, history_path=HISTORY_FILE):
+        self.db_path = db_path
+        self.history_path = history_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value))
+        )
+
+    def sync(self):
+        """Import any entries appended to the history file since the last sync"""
+        try:
+            st = os.stat(self.history_path)
+        except FileNotFoundError:
+            return 0
+
+        with self.lock:
+            offset = int(self._get_meta('history_offset', 0))
+            inode = self._get_meta('history_inode')
+            head = read_file_head(self.history_path)
+            old_head = self._get_meta('history_head')
+            old_head = bytes.fromhex(old_head) if old_head is not None else None
+            if inode != str(st.st_ino) or st.st_size < offset or head_changed(old_head, head):
+                # File was replaced, truncated or rewritten; re-import it from
+                # the start. Rows for links already seen are kept and re-pointed.
+                offset = 0
+            elif st.st_size == offset:
+                return 0
+
+            entries, next_offset = read_history_entries(self.history_path, offset)
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO comments "
+                    "(post_id, subreddit, title, link, commented_at, comment_date, file_offset) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(link) DO UPDATE SET file_offset = excluded.file_offset",
+                    [
+                        (
+                            entry['post_id'],
+                            entry['subreddit'],
+                            entry['title'],
+                            entry['link'],
+                            entry['time'],
+                            entry['time'][:10],
+                            entry['offset']
+                        )
+                        for entry in entries
+                    ]
+                )
+                self._set_meta('history_offset', next_offset)
+                self._set_meta('history_inode', st.st_ino)
+                self._set_meta('history_head', head.hex())
+            return len(entries)
+
+    def store_id(self):
+        """Random id of this database, for caches derived from it"""
+        with self.lock:
+            store_id = self._get_meta('store_id')
+            if store_id is None:
+                store_id = uuid.uuid4().hex
+                with self.conn:
+                    self._set_meta('store_id', store_id)
+        return store_id
+
+    def last_row_id(self):
+        with self.lock:
+            row = self.conn.execute("SELECT MAX(id) FROM comments").fetchone()
+        return row[0] or 0
+
+    def post_rows(self, after_id=0, since=None):
+        """(row id, post id, commented_at) of rows with a post id, in row order"""
+        sql = "SELECT id, post_id, commented_at FROM comments WHERE id > ? AND post_id IS NOT NULL"
+        params = [after_id]
+        if since:
+            sql += " AND commented_at >= ?"
+            params.append(since)
+        with self.lock:
+            return [tuple(row) for row in self.conn.execute(sql + " ORDER BY id", params)]
+
+    def count_comments_on(self, day):
+        """Number of comments made on a given date"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM comments WHERE comment_date = ?",
+                (day.strftime("%Y-%m-%d"),)
+            ).fetchone()
+        return row[0]
+
+    def count_today(self):
+        return self.count_comments_on(datetime.now().date())
+
+    def query_comments(self, subreddit=None, since=None, until=None, before=None, limit=50):
+        """Filtered history entries, newest first
+
+        `before` is a byte offset into the history file, the same cursor
+        iter_history_reverse() uses, so filtered and unfiltered pages can be
+        walked the same way.
+        """
+        clauses = []
+        params = []
+        if subreddit:
+            clauses.append("subreddit = ?")
+            params.append(subreddit)
+        if since:
+            clauses.append("commented_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("commented_at <= ?")
+            params.append(until)
+        if before is not None:
+            clauses.append("file_offset < ?")
+            params.append(before)
+
+        sql = "SELECT * FROM comments"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY file_offset DESC LIMIT ?"
+        params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [
+            {
+                'time': row['commented_at'],
+                'subreddit': row['subreddit'],
+                'title': row['title'],
+                'offset': row['file_offset'],
+                'link': row['link'],
+                'post_id': row['post_id']
+            }
+            for row in rows
+        ]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
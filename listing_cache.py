@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from praw.models import Submission
+from metrics import metrics
+
+LISTING_CACHE_FILE = os.path.join(os.path.expanduser('~'), 'redditbot', 'cache', 'listings.json')
+
+# Everything is_valid_post() and the main loop read from a submission;
+# post.reply() only needs the id
+POST_FIELDS = (
+    'id', 'title', 'score', 'locked', 'archived', 'stickied', 'over_18',
+    'permalink', 'created_utc', 'num_comments'
+)
+
+class ListingFetcher:
+    """TTL cache of subreddit 'top' listings, merged and deduplicated
+
+    Listings are cached per (subreddit, time_filter) on disk, so a retry
+    after a PrawcoreException or a restart by run_bot reuses what was just
+    fetched instead of spending rate limit on it again.
+    """
+
+    def __init__(self, ttl, path=LISTING_CACHE_FILE):
+        self.ttl = ttl
+        self.path = path
+        self.cache = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self):
+        now = time.time()
+        self.cache = {
+            key: entry for key, entry in self.cache.items()
+            if now - entry['fetched_at'] < self.ttl
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The in-memory cache still works for this process
+            pass
+
+    def fetch(self, reddit, subreddit_name, time_filter, limit):
+        """Return post records for one listing, from cache when still fresh"""
+        key = f"{subreddit_name.lower()}|{time_filter}"
+        entry = self.cache.get(key)
+        if entry and entry['limit'] >= limit and time.time() - entry['fetched_at'] < self.ttl:
+            metrics.inc('bot_listing_cache_total', result='hit')
+            return entry['posts'][:limit]
+
+        metrics.inc('bot_listing_cache_total', result='miss')
+        with metrics.timed('reddit_fetch'):
+            listing = reddit.subreddit(subreddit_name).top(limit=limit, time_filter=time_filter)
+            posts = [
+                {field: getattr(post, field, None) for field in POST_FIELDS}
+                for post in listing
+            ]
+        self.cache[key] = {'fetched_at': time.time(), 'limit': limit, 'posts': posts}
+        self._save()
+        return posts
+
+    def iter_posts(self, reddit, subreddit_name, time_filters, limit, exclude=()):
+        """Yield each candidate submission once across all time filters
+
+        Posts in `exclude` and posts already yielded for an earlier time
+        filter are skipped. Callers that retry on API errors (like
+        get_reddit_posts) should consume it fully inside the retry, since
+        every listing may be fetched while iterating.
+        """
+        seen = set()
+        for time_filter in time_filters:
+            for record in self.fetch(reddit, subreddit_name, time_filter, limit):
+                post_id = record['id']
+                if post_id in seen or post_id in exclude:
+                    continue
+                seen.add(post_id)
+                yield Submission(reddit, _data=dict(record))
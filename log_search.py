@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import time
+from reverse_reader import iter_lines_reverse
+
+LEVELS = ['INFO', 'SUCCESS', 'WARNING', 'ERROR', 'CRITICAL']
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+TEXT_RECORD = re.compile(r'^\[([A-Z]+)\] (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (.*)$', re.DOTALL)
+
+def parse_log_line(line):
+    """Parse one bot.log line into a record, or None for a continuation line
+
+    Handles the '[LEVEL] timestamp - message' lines written by log_info()
+    and friends (including older logs with color codes from the stdout tee)
+    as well as BOT_LOG_FORMAT=json lines.
+    """
+    line = ANSI_ESCAPE.sub('', line).rstrip('\r')
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if isinstance(record, dict) and 'level' in record and 'time' in record:
+            return record
+        return None
+
+    match = TEXT_RECORD.match(line)
+    if match is None:
+        return None
+    level, timestamp, message = match.groups()
+    return {'time': timestamp, 'level': level, 'message': message}
+
+def level_matches(record, min_level):
+    if min_level is None:
+        return True
+    if record['level'] not in LEVELS:
+        return False
+    return LEVELS.index(record['level']) >= LEVELS.index(min_level)
+
+def tail_log(path, count, min_level=None, since=None):
+    """The last `count` records at or above `min_level`, oldest first
+
+    Reads the file backwards, so the cost depends on how far back the
+    matching records are, not on the size of the log. Lines without a
+    level prefix (e.g. tracebacks) are attached to the record above them.
+    """
+    records = []
+    continuation = []
+    for _, raw in iter_lines_reverse(path):
+        line = raw.decode('utf-8', errors='replace')
+        record = parse_log_line(line)
+        if record is None:
+            continuation.append(ANSI_ESCAPE.sub('', line))
+            continue
+
+        if continuation:
+            record['message'] = '\n'.join([record['message']] + continuation[::-1])
+            continuation = []
+        if since is not None and record['time'] < since:
+            break
+        if level_matches(record, min_level):
+            records.append(record)
+            if len(records) >= count:
+                break
+    return records[::-1]
+
+def follow_log(path, watcher, min_level=None, duration=600):
+    """Yield records appended to the log from now on, for up to `duration` seconds"""
+    deadline = time.monotonic() + duration
+    handle = None
+    inode = None
+    buffer = b''
+    try:
+        while time.monotonic() < deadline:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+
+            if st is not None and (handle is None or st.st_ino != inode or st.st_size < handle.tell()):
+                # First open, or bot.log was rotated: read the new file from
+                # the start (but skip existing content on the first open)
+                first_open = handle is None
+                if handle is not None:
+                    handle.close()
+                handle = open(path, 'rb')
+                inode = st.st_ino
+                buffer = b''
+                if first_open:
+                    handle.seek(0, os.SEEK_END)
+
+            if handle is not None:
+                buffer += handle.read()
+                *lines, buffer = buffer.split(b'\n')
+                for raw in lines:
+                    record = parse_log_line(raw.decode('utf-8', errors='replace'))
+                    if record is not None and level_matches(record, min_level):
+                        yield record
+
+            # Wake on the next write, or periodically so callers can notice
+            # a disconnected client
+            yield None
+            watcher.wait(timeout=min(15, max(deadline - time.monotonic(), 0)))
+    finally:
+        if handle is not None:
+            handle.close()
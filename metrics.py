@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_FILE = os.environ.get(
+    'BOT_METRICS_FILE',
+    os.path.join(os.path.expanduser('~'), 'redditbot', 'metrics.json')
+)
+
+# Upper bounds in seconds; Reddit and LLM calls range from tens of
+# milliseconds to a couple of minutes on a slow free model
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+class Metrics:
+    """In-process counters and latency histograms for the bot
+
+    The bot runs as a subprocess of run_bot, so the numbers are published
+    by atomically rewriting a small JSON file that web_server.py reads and
+    renders as Prometheus text on /metrics.
+    """
+
+    def __init__(self, path=METRICS_FILE, flush_interval=10):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.started_at = time.time()
+        self.last_flush = 0
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        with self.lock:
+            key = (name, _label_key(labels))
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {
+                    'counts': [0] * len(LATENCY_BUCKETS),
+                    'sum': 0.0,
+                    'count': 0
+                }
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    hist['counts'][i] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    @contextmanager
+    def timed(self, operation):
+        """Count, time and record errors for one call of an operation"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc('bot_errors_total', operation=operation)
+            raise
+        finally:
+            self.observe('bot_operation_duration_seconds', time.perf_counter() - start, operation=operation)
+            self.inc('bot_calls_total', operation=operation)
+            self.flush()
+
+    @contextmanager
+    def sleeping(self, reason):
+        """Track time spent deliberately idle, split out from working time"""
+        self.set_gauge('bot_sleeping', 1)
+        self.flush(force=True)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.inc('bot_sleep_seconds_total', time.monotonic() - start, reason=reason)
+            self.set_gauge('bot_sleeping', 0)
+            self.flush(force=True)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'started_at': self.started_at,
+                'updated_at': time.time(),
+                'buckets': list(LATENCY_BUCKETS),
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                'gauges': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.gauges.items()
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), **hist, 'counts': list(hist['counts'])}
+                    for (name, labels), hist in self.histograms.items()
+                ]
+            }
+
+    def flush(self, force=False):
+        """Write the snapshot to disk, at most once per flush_interval"""
+        now = time.monotonic()
+        if not force and now - self.last_flush < self.flush_interval:
+            return
+        self.last_flush = now
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Metrics must never take the bot down
+            pass
+
+def read_metrics_snapshot(path=METRICS_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = [f'{key}="{str(value)}"' for key, value in sorted(labels.items())]
+    return '{' + ','.join(parts) + '}'
+
+def render_prometheus(snapshot):
+    """Render a metrics snapshot in the Prometheus text exposition format"""
+    if snapshot is None:
+        return "# No metrics published by the bot yet\nbot_up 0\n"
+
+    lines = []
+    seen_types = set()
+
+    def declare(name, metric_type):
+        if name not in seen_types:
+            seen_types.add(name)
+            lines.append(f"# TYPE {name} {metric_type}")
+
+    age = time.time() - snapshot['updated_at']
+    uptime = snapshot['updated_at'] - snapshot['started_at']
+    declare('bot_metrics_age_seconds', 'gauge')
+    lines.append(f"bot_metrics_age_seconds {age:.3f}")
+    declare('bot_process_uptime_seconds', 'gauge')
+    lines.append(f"bot_process_uptime_seconds {uptime:.3f}")
+
+    sleep_total = 0.0
+    # Samples of one metric family have to be contiguous
+    for counter in sorted(snapshot['counters'], key=lambda c: c['name']):
+        declare(counter['name'], 'counter')
+        lines.append(f"{counter['name']}{_format_labels(counter['labels'])} {counter['value']}")
+        if counter['name'] == 'bot_sleep_seconds_total':
+            sleep_total += counter['value']
+    declare('bot_work_seconds_total', 'counter')
+    lines.append(f"bot_work_seconds_total {max(uptime - sleep_total, 0):.3f}")
+
+    for gauge in sorted(snapshot['gauges'], key=lambda g: g['name']):
+        declare(gauge['name'], 'gauge')
+        lines.append(f"{gauge['name']}{_format_labels(gauge['labels'])} {gauge['value']}")
+
+    for hist in sorted(snapshot['histograms'], key=lambda h: h['name']):
+        name = hist['name']
+        declare(name, 'histogram')
+        for bound, count in zip(snapshot['buckets'], hist['counts']):
+            labels = dict(hist['labels'], le=bound)
+            lines.append(f"{name}_bucket{_format_labels(labels)} {count}")
+        labels = dict(hist['labels'], le='+Inf')
+        lines.append(f"{name}_bucket{_format_labels(labels)} {hist['count']}")
+        lines.append(f"{name}_sum{_format_labels(hist['labels'])} {hist['sum']:.6f}")
+        lines.append(f"{name}_count{_format_labels(hist['labels'])} {hist['count']}")
+
+    return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
@@ -0,0 +1,155 @@
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.path.join(os.path.expanduser('~'), 'redditbot', 'logs', 'profiles')
+
+logger = logging.getLogger('redditbot')
+
+class SamplingProfiler:
+    """Low-overhead stack sampler with periodic tracemalloc snapshots
+
+    Every `sample_interval` seconds the current stack of each thread is
+    recorded. Every `write_interval` seconds the samples are written as
+    collapsed stacks (one 'frame;frame;frame count' line per stack, ready
+    for flamegraph tools) along with the top memory allocation sites and
+    their growth since the previous snapshot.
+    """
+
+    def __init__(self, profile_dir, sample_interval, write_interval, keep):
+        self.profile_dir = profile_dir
+        self.sample_interval = sample_interval
+        self.write_interval = write_interval
+        self.keep = keep
+        self.samples = Counter()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.previous_snapshot = None
+
+    def start(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        if self.samples:
+            self.write()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        next_write = time.monotonic() + self.write_interval
+        while not self.stop_event.wait(self.sample_interval):
+            self.sample(own_ident)
+            if time.monotonic() >= next_write:
+                self.write()
+                next_write = time.monotonic() + self.write_interval
+
+    def sample(self, skip_ident):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def write(self):
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        samples, self.samples = self.samples, Counter()
+        try:
+            with open(os.path.join(self.profile_dir, f"cpu-{stamp}.collapsed"), 'w', encoding='utf-8') as f:
+                for stack, count in samples.most_common():
+                    f.write(f"{stack} {count}\n")
+
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__)
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            with open(os.path.join(self.profile_dir, f"memory-{stamp}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"Traced memory: current={current} bytes, peak={peak} bytes\n\n")
+                f.write("Top allocation sites:\n")
+                for stat in snapshot.statistics('lineno')[:30]:
+                    f.write(f"{stat}\n")
+                if self.previous_snapshot is not None:
+                    f.write("\nGrowth since previous snapshot:\n")
+                    for stat in snapshot.compare_to(self.previous_snapshot, 'lineno')[:30]:
+                        f.write(f"{stat}\n")
+            self.previous_snapshot = snapshot
+            self._prune()
+        except OSError as e:
+            logger.error(f"Error writing profile: {str(e)}")
+
+    def _prune(self):
+        for prefix in ('cpu-', 'memory-'):
+            files = sorted(name for name in os.listdir(self.profile_dir) if name.startswith(prefix))
+            for name in files[:-self.keep]:
+                os.remove(os.path.join(self.profile_dir, name))
+
+_profiler = None
+
+def start_profiling():
+    """Start the profiler if BOT_PROFILE=1
+
+    Tuning: BOT_PROFILE_SAMPLE_MS (default 10), BOT_PROFILE_INTERVAL seconds
+    between written profiles (default 600), BOT_PROFILE_KEEP (default 24).
+    """
+    global _profiler
+    if os.environ.get('BOT_PROFILE') != '1' or _profiler is not None:
+        return None
+    _profiler = SamplingProfiler(
+        PROFILE_DIR,
+        sample_interval=float(os.environ.get('BOT_PROFILE_SAMPLE_MS', 10)) / 1000,
+        write_interval=float(os.environ.get('BOT_PROFILE_INTERVAL', 600)),
+        keep=int(os.environ.get('BOT_PROFILE_KEEP', 24))
+    )
+    _profiler.start()
+    logger.info(f"Profiling enabled, writing profiles to {PROFILE_DIR}")
+    return _profiler
+
+def stop_profiling():
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
+
+def list_profiles(profile_dir=PROFILE_DIR):
+    """Profile files, newest first"""
+    try:
+        names = os.listdir(profile_dir)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        path = os.path.join(profile_dir, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            # Pruned by the bot since listdir()
+            continue
+        profiles.append({
+            'mtime': st.st_mtime,
+            'name': name,
+            'kind': 'cpu' if name.startswith('cpu-') else 'memory',
+            'size': st.st_size,
+            'modified': datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+        })
+    profiles.sort(key=lambda profile: profile['mtime'], reverse=True)
+    for profile in profiles:
+        del profile['mtime']
+    return profiles
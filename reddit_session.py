@@ -0,0 +1,65 @@
+import logging
+import os
+import praw
+from prawcore.exceptions import InvalidToken, OAuthException, ResponseException
+from bot_logging import SUCCESS
+from metrics import metrics
+
+logger = logging.getLogger('redditbot')
+
+def is_auth_error(error):
+    """Whether an API error means our credentials or token went bad"""
+    if isinstance(error, (OAuthException, InvalidToken)):
+        return True
+    return isinstance(error, ResponseException) and error.response.status_code == 401
+
+class RedditSession:
+    """One authenticated praw client shared by every subreddit and retry
+
+    praw keeps a single HTTP connection pool per client and refreshes the
+    script token by itself when it expires, so the client is only rebuilt
+    after an auth failure. The identity check (user.me()) runs once per
+    client instead of once per subreddit.
+    """
+
+    def __init__(self, **overrides):
+        self.overrides = overrides
+        self.reddit = None
+        self.user = None
+        self.auth_round_trips = 0
+        self.auth_round_trips_saved = 0
+
+    def _connect(self):
+        with metrics.timed('reddit_auth'):
+            reddit = praw.Reddit(
+                client_id=os.environ["CLIENT_ID"],
+                client_secret=os.environ["CLIENT_SECRET"],
+                password=os.environ["REDDIT_PASSWORD"],
+                user_agent=os.environ["USER_AGENT"],
+                username=os.environ["REDDIT_USERNAME"],
+                ratelimit_seconds=300,
+                check_for_async=False,
+                **self.overrides
+            )
+            self.user = reddit.user.me()
+        self.reddit = reddit
+        self.auth_round_trips += 1
+        metrics.inc('bot_auth_round_trips_total')
+        logger.log(SUCCESS, f"Successfully authenticated as: {self.user.name}")
+
+    def get(self):
+        """Return the shared client, authenticating only if needed"""
+        if self.reddit is None:
+            logger.info(f"Connecting with username: {os.environ['REDDIT_USERNAME']}")
+            self._connect()
+        else:
+            self.auth_round_trips_saved += 1
+            metrics.inc('bot_auth_round_trips_saved_total')
+        return self.reddit
+
+    def invalidate(self):
+        """Drop the client so the next get() authenticates from scratch"""
+        if self.reddit is not None:
+            logger.warning("Discarding Reddit session after an authentication failure")
+        self.reddit = None
+        self.user = None
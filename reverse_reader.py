@@ -0,0 +1,29 @@
+import mmap
+import os
+
+def iter_lines_reverse(path, end=None):
+    """Yield (offset, line) pairs from the end of a file backwards
+
+    The file is memory-mapped, so only the pages actually walked are read no
+    matter how large it is. `end` is an exclusive byte offset that must sit
+    on a line boundary (e.g. an offset previously yielded here). A trailing
+    line without a newline is still being written and is skipped.
+    """
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if end is None or end > size:
+            end = size
+        if end <= 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = end
+            if mm[pos - 1:pos] != b'\n':
+                pos = mm.rfind(b'\n', 0, pos) + 1
+            while pos > 0:
+                start = mm.rfind(b'\n', 0, pos - 1) + 1
+                yield start, mm[start:pos - 1]
+                pos = start
@@ -3,19 +3,209 @@ import subprocess
 import time
 import sys
 import os
+import json
+import fcntl
+import random
+import signal
+import threading
+from datetime import datetime
+import heartbeat
+import shutdown
+
+STATE_DIR = os.path.join(os.path.expanduser('~'), 'redditbot')
+LOCK_FILE = os.path.join(STATE_DIR, 'supervisor.lock')
+STATE_FILE = os.path.join(STATE_DIR, 'supervisor.json')
+
+# How often a standby supervisor retries the lock
+STANDBY_INTERVAL = 30
+
+# Health checks and restart policy
+POLL_INTERVAL = 1
+HEARTBEAT_TIMEOUT = int(os.environ.get('BOT_HEARTBEAT_TIMEOUT', 900))  # No beat for 15 minutes = hung
+KILL_GRACE = 15           # Seconds between SIGTERM and SIGKILL
+STOP_SIGNAL_GRACE = 1     # How long an exited bot waits for our own stop signal
+BACKOFF_BASE = 5          # First restart delay after a crash
+BACKOFF_MAX = 600         # Cap for crash-loop backoff
+STABLE_UPTIME = 600       # A run this long resets the backoff
+MAX_HISTORY = 20          # Restarts kept in supervisor.json
+
+# Set on SIGTERM/SIGINT when running as the worker process
+supervisor_stop = threading.Event()
+
+def acquire_supervisor_lock():
+    """Take the single-supervisor lock, or return None if another process has it
+
+    The lock is also held by the running bot (see run_bot), so it is only
+    free once both the supervisor and its bot are gone.
+    """
+    os.makedirs(STATE_DIR, exist_ok=True)
+    handle = open(LOCK_FILE, 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+def supervisor_is_running():
+    """Check whether some process currently holds the supervisor lock"""
+    try:
+        handle = open(LOCK_FILE, 'r')
+    except FileNotFoundError:
+        return False
+    with handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        return False
+
+def write_supervisor_state(state):
+    tmp_path = f"{STATE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, STATE_FILE)
+
+def read_supervisor_state():
+    """Supervisor state for other processes (e.g. web workers) to report"""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        state = {}
+    state['supervisor_running'] = supervisor_is_running()
+    age = heartbeat.heartbeat_age()
+    state['heartbeat_age_seconds'] = round(age, 1) if age is not None else None
+    # Wait the bot is in (or was in when it stopped) and how long is left
+    state['schedule'] = shutdown.load_schedule()
+    return state
+
+def backoff_delay(failures):
+    """Exponential backoff with jitter for consecutive failed runs"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(failures - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def stop_process(process):
+    process.terminate()
+    try:
+        process.wait(KILL_GRACE)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def watch_bot(process, started):
+    """Wait for the bot to exit, killing it if its heartbeat goes stale
+
+    Returns the reason the run ended: 'exited', 'hung' or 'stopped'.
+    """
+    while True:
+        try:
+            process.wait(POLL_INTERVAL)
+        except subprocess.TimeoutExpired:
+            pass
+        else:
+            # A platform shutdown signals the whole group and the bot often
+            # exits before our own handler has run; that is a stop, not a crash
+            if supervisor_stop.wait(STOP_SIGNAL_GRACE):
+                return 'stopped'
+            return 'exited'
+
+        if supervisor_stop.is_set():
+            # The bot wakes from any wait on SIGTERM and exits cleanly
+            stop_process(process)
+            return 'stopped'
+
+        # Before the first beat, count from process start
+        age = heartbeat.heartbeat_age()
+        if age is None:
+            age = time.monotonic() - started
+        if age > HEARTBEAT_TIMEOUT:
+            print(f"Bot heartbeat is {int(age)}s old, restarting it")
+            stop_process(process)
+            return 'hung'
 
 def run_bot():
+    # Only one supervisor may run the bot; any others wait on standby and
+    # take over if the active one goes away
+    lock = acquire_supervisor_lock()
+    while lock is None:
+        if supervisor_stop.wait(STANDBY_INTERVAL):
+            return
+        lock = acquire_supervisor_lock()
+
+    state = {
+        'supervisor_pid': os.getpid(),
+        'supervisor_started': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'status': 'starting',
+        'bot_pid': None,
+        'bot_started': None,
+        'restarts': 0,
+        'consecutive_failures': 0,
+        'history': []
+    }
+    failures = 0
+
     while True:
         try:
             # Run the bot
-            process = subprocess.Popen([sys.executable, 'app.py'])
-            process.wait()
-            
-            # If the bot crashes, wait 5 minutes before restarting
-            time.sleep(300)
+            heartbeat.clear()
+            started = time.monotonic()
+            # The bot inherits the locked file, so the lock stays held for as
+            # long as the bot runs, even if this supervisor is killed first;
+            # a standby then cannot start a second bot next to the orphan
+            process = subprocess.Popen([sys.executable, 'app.py'], pass_fds=(lock.fileno(),))
+            state.update(
+                status='running',
+                bot_pid=process.pid,
+                bot_started=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            )
+            write_supervisor_state(state)
+
+            reason = watch_bot(process, started)
+            uptime = time.monotonic() - started
+            if reason == 'stopped':
+                state.update(status='stopped', bot_pid=None, last_exit_code=process.returncode)
+                write_supervisor_state(state)
+                return
+
+            # Crash loops back off exponentially; a run that stayed up for a
+            # while, or a clean exit, restarts after the base delay
+            if reason == 'exited' and process.returncode == 0:
+                failures = 0
+            elif uptime >= STABLE_UPTIME:
+                failures = 1
+            else:
+                failures += 1
+            delay = backoff_delay(failures)
+
+            state['history'] = (state['history'] + [{
+                'started': state['bot_started'],
+                'ended': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'uptime_seconds': round(uptime, 1),
+                'exit_code': process.returncode,
+                'reason': reason,
+                'restart_delay_seconds': round(delay, 1)
+            }])[-MAX_HISTORY:]
+            state.update(
+                status='restarting',
+                bot_pid=None,
+                last_exit_code=process.returncode,
+                restarts=state['restarts'] + 1,
+                consecutive_failures=failures
+            )
+            write_supervisor_state(state)
+            if supervisor_stop.wait(delay):
+                return
         except Exception as e:
             print(f"Error running bot: {e}")
-            time.sleep(300)
+            if supervisor_stop.wait(BACKOFF_MAX):
+                return
+
+def _handle_signal(signum, frame):
+    supervisor_stop.set()
 
 if __name__ == "__main__":
-    run_bot() 
\ No newline at end of file
+    signal.signal(signal.SIGTERM, _handle_signal)
+    signal.signal(signal.SIGINT, _handle_signal)
+    run_bot()
@@ -0,0 +1,186 @@
+import logging
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from bot_config import DEFAULT_CONFIG
+from history_store import TIMESTAMP_FORMAT
+
+SEEN_POSTS_FILE = os.path.join(os.path.expanduser('~'), 'redditbot', 'cache', 'seen_posts.bin')
+
+# magic, format version, store id, max age in days, last store row id, count
+SNAPSHOT_HEADER = struct.Struct('<4sH32sIQQ')
+SNAPSHOT_MAGIC = b'SEEN'
+SNAPSHOT_VERSION = 1
+
+logger = logging.getLogger('redditbot')
+
+def decode_post_id(post_id):
+    """Base36 post id to an integer, or None if it does not look like one"""
+    try:
+        value = int(post_id, 36)
+    except (TypeError, ValueError):
+        return None
+    return value if 0 <= value < 2 ** 64 else None
+
+class SeenPosts:
+    """Compact, persisted set of recently commented post ids
+
+    Ids are stored as sorted 64-bit integers with a parallel array of
+    comment times (12 bytes per post instead of a Python string in a set),
+    and membership is a binary search. Posts older than `max_age_days`
+    are dropped. The arrays are saved to a binary snapshot along with the
+    last history store row they include, so a restart only reads rows
+    added since.
+    """
+
+    def __init__(self, store, path=SEEN_POSTS_FILE, max_age_days=DEFAULT_CONFIG['seen_posts_days']):
+        self.store = store
+        self.path = path
+        self.max_age_days = max_age_days
+        self.ids = array('Q')
+        self.times = array('I')
+        self.last_row_id = 0
+        self.loaded = False
+        # Posts marked in this process whose ids are not base36 numbers
+        self.extra = set()
+
+    def __contains__(self, post_id):
+        value = decode_post_id(post_id)
+        if value is None:
+            return post_id in self.extra
+        index = bisect_left(self.ids, value)
+        return index < len(self.ids) and self.ids[index] == value
+
+    def add(self, post_id):
+        value = decode_post_id(post_id)
+        if value is None:
+            self.extra.add(post_id)
+        else:
+            self._insert(value, int(time.time()))
+
+    def __len__(self):
+        return len(self.ids) + len(self.extra)
+
+    def set_max_age(self, days):
+        if days != self.max_age_days:
+            self.max_age_days = days
+            # The snapshot was cut at the old age; rebuild on the next refresh
+            self.loaded = False
+
+    def _insert(self, value, commented_at):
+        index = bisect_left(self.ids, value)
+        if index < len(self.ids) and self.ids[index] == value:
+            self.times[index] = max(self.times[index], commented_at)
+        else:
+            self.ids.insert(index, value)
+            self.times.insert(index, commented_at)
+
+    def _cutoff(self):
+        return datetime.now() - timedelta(days=self.max_age_days)
+
+    def refresh(self):
+        """Pick up rows added to the history store since the last refresh
+
+        Call after store.sync(). Returns the number of rows read.
+        """
+        if not self.loaded:
+            self.loaded = True
+            if not self._load():
+                return self._rebuild()
+
+        rows = self.store.post_rows(after_id=self.last_row_id)
+        for row_id, post_id, commented_at in rows:
+            value = decode_post_id(post_id)
+            if value is not None:
+                self._insert(value, self._timestamp(commented_at))
+            self.last_row_id = max(self.last_row_id, row_id)
+
+        expired = self._expire()
+        if rows or expired:
+            self._save()
+        return len(rows)
+
+    def _rebuild(self):
+        """Fill the arrays from the history store, recent rows only"""
+        cutoff = self._cutoff().strftime(TIMESTAMP_FORMAT)
+        rows = self.store.post_rows(since=cutoff)
+        latest = {}
+        for row_id, post_id, commented_at in rows:
+            value = decode_post_id(post_id)
+            if value is not None:
+                latest[value] = max(latest.get(value, 0), self._timestamp(commented_at))
+        ordered = sorted(latest)
+        self.ids = array('Q', ordered)
+        self.times = array('I', (latest[value] for value in ordered))
+        self.last_row_id = self.store.last_row_id()
+        self._save()
+        logger.info(f"Rebuilt seen posts from history store: {len(self.ids)} posts")
+        return len(rows)
+
+    def _expire(self):
+        cutoff = int(self._cutoff().timestamp())
+        if not self.times or min(self.times) >= cutoff:
+            return 0
+        keep = [index for index, commented_at in enumerate(self.times) if commented_at >= cutoff]
+        expired = len(self.times) - len(keep)
+        if expired:
+            self.ids = array('Q', (self.ids[index] for index in keep))
+            self.times = array('I', (self.times[index] for index in keep))
+        return expired
+
+    @staticmethod
+    def _timestamp(commented_at):
+        try:
+            return int(datetime.strptime(commented_at, TIMESTAMP_FORMAT).timestamp())
+        except (TypeError, ValueError):
+            return int(time.time())
+
+    def _load(self):
+        """Read the snapshot; False if it is missing or from another store"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            magic, version, store_id, max_age_days, last_row_id, count = \
+                SNAPSHOT_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return False
+
+        ids = array('Q')
+        times = array('I')
+        start = SNAPSHOT_HEADER.size
+        ids_end = start + count * ids.itemsize
+        if (magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION
+                or store_id.decode('ascii', 'replace') != self.store.store_id()
+                or max_age_days != self.max_age_days
+                or last_row_id > self.store.last_row_id()
+                or len(data) != ids_end + count * times.itemsize):
+            return False
+
+        ids.frombytes(data[start:ids_end])
+        times.frombytes(data[ids_end:])
+        self.ids, self.times, self.last_row_id = ids, times, last_row_id
+        return True
+
+    def _save(self):
+        try:
+            header = SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                self.store.store_id().encode('ascii'),
+                self.max_age_days,
+                self.last_row_id,
+                len(self.ids)
+            )
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(self.ids.tobytes())
+                f.write(self.times.tobytes())
+            os.replace(tmp_path, self.path)
+        except (OSError, struct.error):
+            # The in-memory copy still works; the next start rebuilds it
+            pass
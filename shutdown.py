@@ -0,0 +1,63 @@
+import json
+import os
+import signal
+import threading
+import time
+
+SCHEDULE_FILE = os.path.join(os.path.expanduser('~'), 'redditbot', 'schedule.json')
+
+shutdown_requested = threading.Event()
+
+class ShutdownRequested(BaseException):
+    """Raised at the next safe point after SIGTERM/SIGINT
+
+    Derives from BaseException like KeyboardInterrupt, so the bot's broad
+    `except Exception` retry handlers let it through.
+    """
+
+def _handle_signal(signum, frame):
+    # Only flag the request; whatever is running (e.g. a history write)
+    # finishes and the next wait or check point unwinds the loop
+    shutdown_requested.set()
+
+def install_signal_handlers():
+    signal.signal(signal.SIGTERM, _handle_signal)
+    signal.signal(signal.SIGINT, _handle_signal)
+
+def check():
+    """Raise ShutdownRequested if a shutdown signal has arrived"""
+    if shutdown_requested.is_set():
+        raise ShutdownRequested()
+
+def wait(seconds):
+    """Wait up to `seconds`, returning early with True on shutdown"""
+    return shutdown_requested.wait(seconds)
+
+def save_schedule(reason, wake_at, path=SCHEDULE_FILE):
+    """Record the wait in progress so a restarted bot can resume it"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'reason': reason, 'wake_at': wake_at}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def load_schedule(path=SCHEDULE_FILE):
+    """The saved wait with its remaining seconds, or None if it is over"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            schedule = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    schedule['remaining_seconds'] = schedule['wake_at'] - time.time()
+    if schedule['remaining_seconds'] <= 0:
+        return None
+    return schedule
+
+def clear_schedule(path=SCHEDULE_FILE):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
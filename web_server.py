@@ -1,15 +1,27 @@
-from flask import Flask, render_template, jsonify
+from flask import Blueprint, Flask, render_template, jsonify, request, Response, abort, send_from_directory
 import threading
-from run_bot import run_bot
+import hashlib
+import queue
+import time
+from collections import Counter
+from itertools import islice
+from run_bot import run_bot, read_supervisor_state
 from datetime import datetime
 import os
 import json
+from history_store import CommentHistoryStore, HistoryTailReader, iter_history_reverse
+from metrics import read_metrics_snapshot, render_prometheus
+from file_watch import FileWatcher, file_signature
+from profiling import PROFILE_DIR, list_profiles
+from bot_logging import LOG_FILE
+from bot_config import bot_config
+from log_search import LEVELS, follow_log, tail_log
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Verify required environment variables
+# Required to run the bot (not just the dashboard)
 required_vars = [
     'OPENROUTER_API_KEY',
     'REDDIT_USERNAME',
@@ -19,81 +31,403 @@ required_vars = [
     'USER_AGENT'
 ]
 
-missing_vars = [var for var in required_vars if not os.getenv(var)]
-if missing_vars:
-    raise Exception(f"Missing required environment variables: {', '.join(missing_vars)}")
+dashboard = Blueprint('dashboard', __name__)
 
-app = Flask(__name__)
-
-# Start time of the bot
+# Start time of the web server
 START_TIME = datetime.now()
 
-# Start the bot in a separate thread
-bot_thread = threading.Thread(target=run_bot, daemon=True)
-bot_thread.start()
+# Parsed comment history, refreshed incrementally as the bot appends to it
+history_reader = HistoryTailReader()
+
+# Indexed copy of the history used for filtered /api/comments queries
+history_store = CommentHistoryStore()
+
+COMMENTS_PAGE_SIZE = 50
+COMMENTS_MAX_PAGE_SIZE = 500
+
+LOG_TAIL_DEFAULT = 100
+LOG_TAIL_MAX = 5000
+LOG_FOLLOW_SECONDS = 600
 
 def get_comment_history():
-    try:
-        with open('comment_history.txt', 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        comments = []
-        current_comment = {}
-        
-        for line in lines:
-            if line.startswith('[') and ']' in line:
-                # This is a timestamp line with subreddit
-                timestamp = line[1:20]
-                subreddit = line.split('r/')[1].split(' -')[0] if 'r/' in line else 'unknown'
-                title = line.split(' - ', 1)[1].strip() if ' - ' in line else ''
-                current_comment = {
-                    'time': timestamp,
-                    'subreddit': subreddit,
-                    'title': title
-                }
-            elif line.startswith('http'):
-                # This is a comment link
-                current_comment['link'] = line.strip()
-                comments.append(current_comment.copy())
-                
-        return comments
-    except FileNotFoundError:
-        return []
+    return history_reader.read()
 
 def get_uptime():
     delta = datetime.now() - START_TIME
     hours = delta.total_seconds() / 3600
     return f"{int(hours)}h"
 
-def count_today_comments():
-    comments = get_comment_history()
-    today = datetime.now().date()
-    return sum(1 for comment in comments 
-              if datetime.strptime(comment['time'], "%Y-%m-%d %H:%M:%S").date() == today)
-
 def get_active_subreddits():
-    try:
-        with open('subreddits.txt', 'r') as f:
-            return len([line.strip() for line in f if line.strip()])
-    except FileNotFoundError:
-        return 0
+    return len(bot_config.subreddits)
+
+class StatsCache:
+    """Precomputed /api/stats payload shared by every dashboard viewer
+
+    The snapshot is rebuilt only when comment_history.txt or the config
+    version change (or the day/uptime hour rolls over). Aggregates are
+    updated from newly appended entries only, so a rebuild costs about as
+    much as the new lines.
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.lock = threading.Lock()
+        self.key = None
+        self.etag = None
+        self.body = None
+        self.generation = None
+        self.consumed = 0
+        self.by_subreddit = Counter()
+        self.by_date = Counter()
+
+    def _current_key(self):
+        return (
+            file_signature(self.reader.path),
+            bot_config.version,
+            datetime.now().date().isoformat(),
+            get_uptime()
+        )
+
+    def get(self):
+        """Return (etag, json_body) for the current stats"""
+        key = self._current_key()
+        with self.lock:
+            if key != self.key:
+                self._rebuild(key)
+            return self.etag, self.body
+
+    def _rebuild(self, key):
+        comments = self.reader.read()
+        if self.generation != self.reader.generation or self.consumed > len(comments):
+            self.generation = self.reader.generation
+            self.consumed = 0
+            self.by_subreddit.clear()
+            self.by_date.clear()
+
+        for comment in comments[self.consumed:]:
+            self.by_subreddit[comment['subreddit']] += 1
+            self.by_date[comment['time'][:10]] += 1
+        self.consumed = len(comments)
+
+        snapshot = {
+            'total_comments': len(comments),
+            'today_comments': self.by_date[key[2]],
+            'active_subreddits': get_active_subreddits(),
+            'uptime': key[3],
+            'recent_comments': comments[-10:],  # Last 10 comments
+            'subreddit_breakdown': dict(self.by_subreddit.most_common())
+        }
+        self.body = json.dumps(snapshot)
+        self.etag = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        self.key = key
+
+stats_cache = StatsCache(history_reader)
+
+# Long-lived streams (/api/events, /api/logs?follow=1) each hold a gthread
+# worker thread for minutes; cap them so regular requests always have
+# threads left (the Procfile runs 32 threads per worker)
+MAX_STREAMS = int(os.getenv('WEB_MAX_STREAMS', 24))
+STREAM_RETRY_SECONDS = 30
+
+stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+def streaming_response(generate, on_close=None, **kwargs):
+    """A streaming Response holding one stream slot, or a 503 if none is free"""
+    if not stream_slots.acquire(blocking=False):
+        if on_close is not None:
+            on_close()
+        return jsonify({'error': 'Too many open streams, try again later'}), 503, {
+            'Retry-After': str(STREAM_RETRY_SECONDS)
+        }
+
+    response = Response(generate(), **kwargs)
+    # Runs when the server closes the response, even if the client went
+    # away before the generator ever started
+    response.call_on_close(stream_slots.release)
+    if on_close is not None:
+        response.call_on_close(on_close)
+    return response
+
+# Server-sent events
+SSE_KEEPALIVE_SECONDS = 15
+SSE_MAX_STREAM_SECONDS = 600   # Clients reconnect on their own; frees the thread
+SSE_QUEUE_SIZE = 100
+
+class HistoryEventHub:
+    """One history watcher per process, fanned out to every SSE client
+
+    The watcher thread wakes on file-change notifications, reads only the
+    newly appended entries and pushes them, plus the changed stats, onto
+    each subscriber's queue.
+    """
+
+    def __init__(self, reader, stats):
+        self.reader = reader
+        self.stats = stats
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.thread = None
+        self.generation = None
+        self.consumed = 0
+
+    def subscribe(self):
+        client_queue = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.add(client_queue)
+            if self.thread is None:
+                comments = self.reader.read()
+                self.generation = self.reader.generation
+                self.consumed = len(comments)
+                self.thread = threading.Thread(target=self._run, name='history-events', daemon=True)
+                self.thread.start()
+        return client_queue
+
+    def unsubscribe(self, client_queue):
+        with self.lock:
+            self.subscribers.discard(client_queue)
+
+    def is_subscribed(self, client_queue):
+        with self.lock:
+            return client_queue in self.subscribers
+
+    def publish(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for client_queue in subscribers:
+            try:
+                client_queue.put_nowait(message)
+            except queue.Full:
+                # A client that stopped reading is dropped, not waited on
+                self.unsubscribe(client_queue)
+
+    def _run(self):
+        watcher = FileWatcher(self.reader.path)
+        while True:
+            if not watcher.wait(timeout=60):
+                continue
+            comments = self.reader.read()
+            if self.reader.generation != self.generation:
+                self.generation = self.reader.generation
+                self.consumed = len(comments)
+                self.publish('reset', {})
+                continue
+
+            new_comments = comments[self.consumed:]
+            self.consumed = len(comments)
+            if not new_comments:
+                continue
+            for comment in new_comments:
+                self.publish('comment', comment)
+
+            _, body = self.stats.get()
+            snapshot = json.loads(body)
+            self.publish('stats', {
+                'total_comments': snapshot['total_comments'],
+                'today_comments': snapshot['today_comments'],
+                'subreddit_deltas': dict(Counter(comment['subreddit'] for comment in new_comments))
+            })
+
+event_hub = HistoryEventHub(history_reader, stats_cache)
 
-@app.route('/')
+def parse_date_param(value, end_of_day=False):
+    """Accept 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' query parameters"""
+    if not value:
+        return None
+    if len(value) == 10:
+        datetime.strptime(value, "%Y-%m-%d")
+        return value + (' 23:59:59' if end_of_day else ' 00:00:00')
+    datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return value
+
+def iter_comments(subreddit=None, since=None, until=None, before=None, limit=None):
+    """Yield history entries newest first
+
+    Unfiltered walks read the text file backwards from the cursor; filtered
+    ones page through the SQLite index in batches.
+    """
+    if not (subreddit or since or until):
+        yield from islice(iter_history_reverse(history_reader.path, before), limit)
+        return
+
+    history_store.sync()
+    remaining = limit
+    while remaining is None or remaining > 0:
+        batch_size = COMMENTS_MAX_PAGE_SIZE if remaining is None else min(remaining, COMMENTS_MAX_PAGE_SIZE)
+        batch = history_store.query_comments(subreddit, since, until, before, batch_size)
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        before = batch[-1]['offset']
+        if remaining is not None:
+            remaining -= len(batch)
+
+@dashboard.route('/')
 def home():
     return render_template('index.html')
 
-@app.route('/api/stats')
+@dashboard.route('/api/stats')
 def get_stats():
-    comments = get_comment_history()
-    
+    etag, body = stats_cache.get()
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+
+    # Unchanged polls are answered without touching the snapshot
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
+
+@dashboard.route('/api/comments')
+def get_comments():
+    """Comment history, newest first, with cursor pagination
+
+    Query parameters: subreddit, since, until, cursor (from next_cursor),
+    limit, and stream=1 for an NDJSON stream of every matching entry.
+    """
+    subreddit = request.args.get('subreddit')
+    try:
+        since = parse_date_param(request.args.get('since'))
+        until = parse_date_param(request.args.get('until'), end_of_day=True)
+        cursor = request.args.get('cursor')
+        cursor = int(cursor) if cursor else None
+        limit = request.args.get('limit')
+        limit = int(limit) if limit else None
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
+    except ValueError as e:
+        return jsonify({'error': f"Invalid query parameter: {str(e)}"}), 400
+
+    if request.args.get('stream'):
+        def generate():
+            for comment in iter_comments(subreddit, since, until, cursor, limit):
+                yield json.dumps(comment) + '\n'
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    limit = min(max(limit or COMMENTS_PAGE_SIZE, 1), COMMENTS_MAX_PAGE_SIZE)
+    comments = list(iter_comments(subreddit, since, until, cursor, limit))
     return jsonify({
-        'total_comments': len(comments),
-        'today_comments': count_today_comments(),
-        'active_subreddits': get_active_subreddits(),
-        'uptime': get_uptime(),
-        'recent_comments': comments[-10:] if comments else []  # Last 10 comments
+        'comments': comments,
+        'next_cursor': comments[-1]['offset'] if len(comments) == limit else None
+    })
+
+@dashboard.route('/metrics')
+def prometheus_metrics():
+    """Bot process metrics, published by the bot to a shared file"""
+    return Response(
+        render_prometheus(read_metrics_snapshot()),
+        mimetype='text/plain; version=0.0.4'
+    )
+
+@dashboard.route('/api/events')
+def stream_events():
+    """Server-sent events: new comments and stat changes as they happen"""
+    client_queue = event_hub.subscribe()
+
+    def generate():
+        yield "retry: 5000\n\n"
+        deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            if not event_hub.is_subscribed(client_queue):
+                # Dropped for falling behind: have the page refresh, then end
+                # the stream so EventSource reconnects with a fresh queue
+                yield "event: reset\ndata: {}\n\n"
+                return
+            try:
+                yield client_queue.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+
+    return streaming_response(generate, lambda: event_hub.unsubscribe(client_queue),
+                              mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
     })
 
+@dashboard.route('/api/logs')
+def get_logs():
+    """Recent bot.log records
+
+    Query parameters: tail (number of records), level (minimum level, e.g.
+    ERROR), since, and follow=1 to keep streaming new records as NDJSON.
+    """
+    level = request.args.get('level')
+    level = level.upper() if level else None
+    if level is not None and level not in LEVELS:
+        return jsonify({'error': f"Invalid level, expected one of: {', '.join(LEVELS)}"}), 400
+    try:
+        since = parse_date_param(request.args.get('since'))
+        tail = request.args.get('tail')
+        tail = min(max(int(tail), 0), LOG_TAIL_MAX) if tail else LOG_TAIL_DEFAULT
+    except ValueError as e:
+        return jsonify({'error': f"Invalid query parameter: {str(e)}"}), 400
+
+    records = tail_log(LOG_FILE, tail, level, since) if tail else []
+    if not request.args.get('follow'):
+        return jsonify({'records': records})
+
+    def generate():
+        for record in records:
+            yield json.dumps(record) + '\n'
+        watcher = FileWatcher(LOG_FILE)
+        try:
+            for record in follow_log(LOG_FILE, watcher, level, LOG_FOLLOW_SECONDS):
+                # Blank lines keep the connection alive between records
+                yield '\n' if record is None else json.dumps(record) + '\n'
+        finally:
+            watcher.close()
+
+    return streaming_response(generate, mimetype='application/x-ndjson',
+                              headers={'X-Accel-Buffering': 'no'})
+
+@dashboard.route('/api/profiles')
+def get_profiles():
+    """Profiles written by the bot when it runs with BOT_PROFILE=1"""
+    return jsonify({'profiles': list_profiles()})
+
+@dashboard.route('/api/profiles/latest/<kind>')
+def get_latest_profile(kind):
+    profiles = [profile for profile in list_profiles() if profile['kind'] == kind]
+    if not profiles:
+        abort(404)
+    return send_from_directory(PROFILE_DIR, profiles[0]['name'], mimetype='text/plain')
+
+@dashboard.route('/api/profiles/<name>')
+def get_profile(name):
+    return send_from_directory(PROFILE_DIR, name, mimetype='text/plain')
+
+@dashboard.route('/api/bot')
+def get_bot_state():
+    """State of the bot supervisor, whichever process is running it"""
+    return jsonify(read_supervisor_state())
+
+def start_bot_supervisor():
+    """Start a supervisor thread in this process
+
+    Every process may call this; the supervisor lock in run_bot makes sure
+    only one of them actually runs the bot while the rest stay on standby.
+    """
+    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    if missing_vars:
+        raise Exception(f"Missing required environment variables: {', '.join(missing_vars)}")
+
+    bot_thread = threading.Thread(target=run_bot, daemon=True)
+    bot_thread.start()
+    return bot_thread
+
+def create_app(start_bot=None):
+    """Build the dashboard app
+
+    The bot is not started on import. With start_bot=None it is started
+    only if EMBED_BOT=1, for deployments without a separate bot worker.
+    """
+    if start_bot is None:
+        start_bot = os.getenv('EMBED_BOT', '0') == '1'
+
+    app = Flask(__name__)
+    app.register_blueprint(dashboard)
+    if start_bot:
+        start_bot_supervisor()
+    return app
+
 if __name__ == '__main__':
     # Create templates directory if it doesn't exist
     os.makedirs('templates', exist_ok=True)
@@ -103,4 +437,4 @@ if __name__ == '__main__':
     if not os.path.exists(template_path):
         print(f"Warning: {template_path} not found. Please create it with the provided HTML content.")
     
-    app.run(host='0.0.0.0', port=10000) 
\ No newline at end of file
+    create_app(start_bot=True).run(host='0.0.0.0', port=10000) 
\ No newline at end of file